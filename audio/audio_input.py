@@ -1,17 +1,22 @@
 # audio/audio_input.py
 import sounddevice as sd
 import queue
+from collections import deque
 import numpy as np
 import time
 
-from config.config import FRAME_DURATION, CHANNELS, AUDIO_FORMAT as CONFIG_AUDIO_FORMAT
+from config.config import FRAME_DURATION, CHANNELS, AUDIO_FORMAT as CONFIG_AUDIO_FORMAT, FRAME_QUEUE_SIZE
 
 class AudioInputManager:
     def __init__(self, sample_rate: int, device_index: int, logger):
         self.sample_rate = sample_rate
         self.device_index = device_index
         self.logger = logger
-        self.frame_queue = queue.Queue()
+        self.frame_queue = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+        self.dropped_frames = 0
+        self.queued_frames = 0
+        self.gaps = deque()  # (index of the queued frame, samples dropped right before it)
+        self._pending_gap = 0
         self.last_log_time = 0
         self.log_interval_s = 10
 
@@ -34,7 +39,33 @@ class AudioInputManager:
             if indata.dtype == np.int16 and (max_val < 500 and max_val != 0):
                 self.logger.warning("Low input level detected! Max amplitude < 500. Check microphone volume.")
 
-        self.frame_queue.put(indata.copy())
+        # Never block the audio callback; drop frames if chunking falls behind.
+        # Dropped samples are recorded against the next queued frame so that timestamps stay on the session clock.
+        if self._pending_gap:
+            self.gaps.append((self.queued_frames, self._pending_gap))
+        try:
+            self.frame_queue.put_nowait(indata.copy())
+            self.queued_frames += 1
+            self._pending_gap = 0
+        except queue.Full:
+            if self._pending_gap:
+                self.gaps.pop()
+            self._pending_gap += frames
+            self.dropped_frames += 1
+            if self.dropped_frames % 100 == 1:
+                self.logger.warning(f"Frame queue full, dropped {self.dropped_frames} frame(s) so far.")
+
+    def dropped_before(self, frame_index: int) -> int:
+        """
+        Args:
+            frame_index (int): Position of a frame in the frame queue, counted from 0
+
+        Returns:
+            int: Samples dropped between that frame and the one queued before it
+        """
+        if self.gaps and self.gaps[0][0] == frame_index:
+            return self.gaps.popleft()[1]
+        return 0
 
     def start_stream(self):
         blocksize = int(FRAME_DURATION * self.sample_rate)
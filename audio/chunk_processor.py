@@ -1,94 +1,200 @@
+from dataclasses import dataclass
 from itertools import count as counter
+from typing import Callable, List, Optional
 import numpy as np
-import time
 import os
-import queue
-import threading
 
 from config.config import (
-    CHUNK_DURATION, OVERLAP_DURATION, SAMPLE_RATE as CONFIG_SAMPLE_RATE,
-    MIN_SILENCE_TO_LOG_S
+    SAMPLE_RATE as CONFIG_SAMPLE_RATE,
+    MIN_SILENCE_TO_LOG_S, RMS_PREFILTER_THRESHOLD, ADAPTIVE_NOISE_GATE,
+    MIN_FINAL_CHUNK_S
 )
-from core.utils import process_audio_chunk_for_speech, save_wav
-
-
-def chunk_processor(
-    sample_rate: int,
-    shutdown_event: threading.Event,
-    stats,
-    audio_input_manager,
-    session,
-    logger,
-    transcription_queue: queue.Queue
-):
-    if sample_rate != CONFIG_SAMPLE_RATE:
-        logger.warning(f"Chunk processor started with sample_rate {sample_rate}Hz, "
-                       f"but config SAMPLE_RATE is {CONFIG_SAMPLE_RATE}Hz. Using {sample_rate}Hz.")
-
-    buffer = []
-    chunk_size_samples = int(CHUNK_DURATION * sample_rate)
-    overlap_size_samples = int(OVERLAP_DURATION * sample_rate)
-    effective_new_audio_per_step_s = CHUNK_DURATION - OVERLAP_DURATION
-
-    if effective_new_audio_per_step_s <= 0:
-        logger.error(f"CHUNK_DURATION ({CHUNK_DURATION}s) must be > OVERLAP_DURATION ({OVERLAP_DURATION}s).")
-        effective_new_audio_per_step_s = CHUNK_DURATION
-
-    chunk_num_generator = counter(start=1)
-    cumulative_silent_s = 0.0
-
-    logger.info("Chunk processor thread started. Waiting for audio frames...")
-
-    while not shutdown_event.is_set():
-        try:
-            frame = audio_input_manager.frame_queue.get(timeout=0.5)
-            buffer.append(frame)
-            total_samples = sum(f.shape[0] for f in buffer)
-
-            if total_samples >= chunk_size_samples:
-                concatenated_audio = np.concatenate(buffer, axis=0)
-                current_chunk = concatenated_audio[:chunk_size_samples].copy()
-
-                if 0 < overlap_size_samples <= len(current_chunk):
-                    tail = current_chunk[-overlap_size_samples:].copy()
-                    remaining = concatenated_audio[chunk_size_samples:]
-                    buffer = [tail] + ([remaining] if len(remaining) > 0 else [])
-                else:
-                    buffer = [concatenated_audio[chunk_size_samples:]] if total_samples > chunk_size_samples else []
-
-                chunk_id = next(chunk_num_generator)
-                chunk_id_str = f"chunk_{chunk_id:04d}"
-
-                speech_audio = process_audio_chunk_for_speech(current_chunk, sample_rate, chunk_id_str, logger)
-
-                if speech_audio is not None:
-                    if cumulative_silent_s >= MIN_SILENCE_TO_LOG_S:
-                        logger.info(f"Speech resumed ({chunk_id_str}) after ~{cumulative_silent_s:.1f}s of silence.")
-                    cumulative_silent_s = 0.0
-
-                    os.makedirs(session.audio_dir, exist_ok=True)
-                    filename = os.path.join(session.audio_dir, f"{chunk_id_str}.wav")
-                    save_wav(speech_audio, filename, sample_rate, logger)
-                    stats.increment_saved()
-
-                    chunk_duration = len(speech_audio) / sample_rate
-                    stats.add_chunk_duration(chunk_duration)
-
-                    logger.info(f"Saved speech chunk: {filename} | Duration: {chunk_duration:.2f}s")
-
-                    # 👇 Now passes chunk_index along with the rest
-                    transcription_queue.put((filename, chunk_id_str, chunk_id))
-
-                else:
-                    cumulative_silent_s += effective_new_audio_per_step_s
-                    stats.increment_skipped(reason="vad")
-                    logger.debug(f"Cumulative silence now approx: {cumulative_silent_s:.1f}s")
-
-        except queue.Empty:
-            logger.debug("Audio frame queue empty after timeout.")
-            continue
-        except Exception as e:
-            logger.error(f"Error in chunk processor loop: {e}", exc_info=True)
-            time.sleep(0.1)
-
-    logger.info("Chunk processor thread gracefully shut down.")
+from config.runtime import runtime_config
+from core.utils import process_audio_chunk_for_speech, save_wav, compute_rms, log_chunk_info
+from core.noise_floor import NoiseFloorEstimator
+
+
+@dataclass
+class AudioChunk:
+    chunk_index: int
+    chunk_id_str: str
+    samples: np.ndarray
+    start_s: float  # Global session time of the first sample
+    stream_sample: int = 0  # Index of the first sample among those received (drops not counted); keys cached features
+    rms: float = 0.0
+    filepath: Optional[str] = None
+
+
+class ChunkAssembler:
+    """
+    Chunking stage: collects captured frames into overlapping fixed-length chunks.
+    Chunk and overlap lengths are read from the runtime config once per chunk,
+    after it is emitted; the auto-tuner changes them at most once per chunk.
+
+    Frames dropped by the capture callback are reported through `dropped_before`
+    (see `AudioInputManager.dropped_before`); the missing samples are added to the
+    session clock so that chunk start times do not drift behind the audio. Cached
+    log-mel frames are keyed by `stream_sample` instead, which counts received
+    samples only, so audio shared by overlapping chunks always has the same key.
+    """
+    def __init__(self, sample_rate: int, logger, noise_floor: Optional[NoiseFloorEstimator] = None,
+                 dropped_before: Optional[Callable[[int], int]] = None):
+        if sample_rate != CONFIG_SAMPLE_RATE:
+            logger.warning(f"Chunk processor started with sample_rate {sample_rate}Hz, "
+                           f"but config SAMPLE_RATE is {CONFIG_SAMPLE_RATE}Hz. Using {sample_rate}Hz.")
+
+        self.sample_rate = sample_rate
+        self.logger = logger
+        self.noise_floor = noise_floor
+        self.buffer = []
+        self.buffered_samples = 0
+        self.chunk_num_generator = counter(start=1)
+        self.buffer_start_sample = 0  # Global sample index of buffer[0][0]
+        self.buffer_stream_sample = 0  # Received-sample index of buffer[0][0]
+        self.dropped_before = dropped_before
+        self.frames_received = 0
+        self.gaps = []  # (buffer offset, dropped samples before it)
+        self._read_sizes()
+
+        if self.overlap_size_samples >= self.chunk_size_samples:
+            logger.error(f"Chunk duration ({runtime_config.chunk_duration}s) must be > "
+                         f"overlap duration ({runtime_config.overlap_duration}s). Overlap disabled.")
+
+    def _read_sizes(self):
+        settings = runtime_config.snapshot()
+        self.chunk_size_samples = int(settings["chunk_duration"] * self.sample_rate)
+        self.overlap_size_samples = int(settings["overlap_duration"] * self.sample_rate)
+
+    def push(self, frame: np.ndarray) -> List[AudioChunk]:
+        if self.dropped_before is not None:
+            gap = self.dropped_before(self.frames_received)
+            if gap:
+                self._add_gap(gap)
+        self.frames_received += 1
+
+        self.buffer.append(frame)
+        self.buffered_samples += frame.shape[0]
+        if self.noise_floor is not None:
+            self.noise_floor.update(frame)
+
+        if self.buffered_samples < self.chunk_size_samples:
+            return []
+
+        concatenated_audio = np.concatenate(self.buffer, axis=0)
+        current_chunk = concatenated_audio[:self.chunk_size_samples].copy()
+        chunk = self._make_chunk(current_chunk)
+
+        if 0 < self.overlap_size_samples < len(current_chunk):
+            tail = current_chunk[-self.overlap_size_samples:].copy()
+            remaining = concatenated_audio[self.chunk_size_samples:]
+            self.buffer = [tail] + ([remaining] if len(remaining) > 0 else [])
+            self._advance(self.chunk_size_samples - self.overlap_size_samples)
+        else:
+            remaining = concatenated_audio[self.chunk_size_samples:]
+            self.buffer = [remaining] if len(remaining) > 0 else []
+            self._advance(self.chunk_size_samples)
+        self.buffered_samples = sum(f.shape[0] for f in self.buffer)
+        self._read_sizes()
+
+        return [chunk]
+
+    def flush(self) -> List[AudioChunk]:
+        """
+        Emits the partially filled buffer at shutdown if it holds enough new audio.
+        """
+        new_samples = self.buffered_samples - self.overlap_size_samples
+        if not self.buffer or new_samples < MIN_FINAL_CHUNK_S * self.sample_rate:
+            return []
+        chunk = self._make_chunk(np.concatenate(self.buffer, axis=0))
+        self.buffer = []
+        self.buffered_samples = 0
+        self.gaps = []
+        self.logger.info(f"Flushed final partial chunk {chunk.chunk_id_str} "
+                         f"({len(chunk.samples) / self.sample_rate:.2f}s).")
+        return [chunk]
+
+    def _add_gap(self, samples: int):
+        if self.buffered_samples == 0:
+            self.buffer_start_sample += samples
+        else:
+            self.gaps.append((self.buffered_samples, samples))
+
+    def _advance(self, samples: int):
+        # Gaps at or before the new buffer start now lie behind it
+        self.buffer_start_sample += samples + sum(gap for offset, gap in self.gaps if offset <= samples)
+        self.buffer_stream_sample += samples
+        self.gaps = [(offset - samples, gap) for offset, gap in self.gaps if offset > samples]
+
+    def _make_chunk(self, samples: np.ndarray) -> AudioChunk:
+        chunk_id = next(self.chunk_num_generator)
+        return AudioChunk(
+            chunk_index=chunk_id,
+            chunk_id_str=f"chunk_{chunk_id:04d}",
+            samples=samples,
+            start_s=self.buffer_start_sample / self.sample_rate,
+            stream_sample=self.buffer_stream_sample,
+        )
+
+
+class SpeechFilter:
+    """
+    VAD stage: drops silent and noise-only chunks and saves speech chunks as WAV.
+    """
+    def __init__(self, sample_rate: int, stats, session, logger, noise_floor: Optional[NoiseFloorEstimator] = None):
+        self.sample_rate = sample_rate
+        self.stats = stats
+        self.session = session
+        self.logger = logger
+        self.noise_floor = noise_floor
+        self.cumulative_silent_s = 0.0
+
+    @staticmethod
+    def _step_s() -> float:
+        step = runtime_config.step_duration()
+        return step if step > 0 else runtime_config.chunk_duration
+
+    def process(self, chunk: AudioChunk) -> List[AudioChunk]:
+        chunk.rms = compute_rms(chunk.samples)
+        gate = self.noise_floor.threshold() if self.noise_floor is not None else RMS_PREFILTER_THRESHOLD
+
+        if RMS_PREFILTER_THRESHOLD <= chunk.rms < gate:
+            # Would have passed the fixed prefilter: this skip saves a VAD pass and likely an ASR call
+            log_chunk_info(chunk.chunk_id_str, chunk.rms, len(chunk.samples) / self.sample_rate, skipped=True,
+                           reason=f"RMS ({chunk.rms:.6f}) < noise gate ({gate:.6f})", logger=self.logger)
+            self.cumulative_silent_s += self._step_s()
+            self.stats.increment_skipped(reason="noise_gate")
+            self.stats.increment_gate_saved()
+            return []
+
+        speech_audio = process_audio_chunk_for_speech(chunk.samples, self.sample_rate, chunk.chunk_id_str, self.logger)
+
+        if speech_audio is None:
+            self.cumulative_silent_s += self._step_s()
+            self.stats.increment_skipped(reason="vad")
+            self.logger.debug(f"Cumulative silence now approx: {self.cumulative_silent_s:.1f}s")
+            return []
+
+        if self.cumulative_silent_s >= MIN_SILENCE_TO_LOG_S:
+            self.logger.info(f"Speech resumed ({chunk.chunk_id_str}) after ~{self.cumulative_silent_s:.1f}s of silence.")
+        self.cumulative_silent_s = 0.0
+
+        os.makedirs(self.session.audio_dir, exist_ok=True)
+        chunk.filepath = os.path.join(self.session.audio_dir, f"{chunk.chunk_id_str}.wav")
+        save_wav(speech_audio, chunk.filepath, self.sample_rate, self.logger)
+        self.stats.increment_saved()
+
+        chunk_duration = len(speech_audio) / self.sample_rate
+        self.stats.add_chunk_duration(chunk_duration)
+
+        self.logger.info(f"Saved speech chunk: {chunk.filepath} | Duration: {chunk_duration:.2f}s")
+
+        if self.noise_floor is not None:
+            self.noise_floor.register_chunk(chunk.chunk_index, chunk.rms)
+
+        return [chunk]
+
+
+def create_noise_floor(session) -> Optional[NoiseFloorEstimator]:
+    # Shared with the ASR stage, which reports chunks the model found no speech in
+    session.noise_floor = NoiseFloorEstimator() if ADAPTIVE_NOISE_GATE else None
+    return session.noise_floor
@@ -0,0 +1,158 @@
+# benchmarks/bench_context_prompt.py
+"""
+ASR cost and seam quality: overlapping chunks versus context-prompted chunks
+without overlap (CONTEXT_PROMPT_MODE).
+
+Both modes run the ASR and post-processing stages on the same recording.
+Errors are measured against one long-form decode of the whole recording by
+the same model (word-level alignment); seam errors are those within
+SEAM_WINDOW_S of a chunk boundary: words lost, garbled or repeated there.
+
+Run from the project root:
+    python -m benchmarks.bench_context_prompt --audio meeting.wav --model small
+    python -m benchmarks.bench_context_prompt --synthetic-asr --asr-rtf 0.3   # ASR cost only
+"""
+import argparse
+import logging
+import os
+import tempfile
+import types
+import wave
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from config.config import SAMPLE_RATE, CHUNK_DURATION, OVERLAP_DURATION, FRAME_DURATION, BEAM_SIZE
+from config.session_stats import SessionStats
+from core import transcriber
+from core.utils import save_wav
+
+SEAM_WINDOW_S = 1.0
+
+logger = logging.getLogger("bench_context_prompt")
+
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wf:
+        if wf.getframerate() != SAMPLE_RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise SystemExit(f"{path}: expected {SAMPLE_RATE} Hz mono int16")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def _normalize(text: str) -> list:
+    tokens = (t.strip(".,!?;:\"'()").lower() for t in text.split())
+    return [t for t in tokens if t]
+
+
+def run_mode(audio: np.ndarray, chunk_s: float, overlap_s: float, context_prompt: bool,
+             language: str, workdir: str) -> tuple:
+    """
+    Returns:
+        tuple: (SessionStats, transcript tokens, seam times in seconds)
+    """
+    name = "context" if context_prompt else "overlap"
+    session = types.SimpleNamespace(session_id=f"bench-{name}", transcript_dir=workdir, language=language,
+                                    keep_audio_chunks=False, context_prompt_mode=context_prompt)
+    stats = SessionStats()
+    chunk, step = int(chunk_s * SAMPLE_RATE), int((chunk_s - overlap_s) * SAMPLE_RATE)
+    tokens, seams = [], []
+    for i, start in enumerate(range(0, len(audio), step), start=1):
+        samples = audio[start:start + chunk]
+        start_s = start / SAMPLE_RATE
+        if i > 1:
+            seams.append(start_s + overlap_s / 2)
+        path = os.path.join(workdir, f"{name}_{i:05d}.wav")
+        save_wav(samples, path, SAMPLE_RATE, logger)
+        transcript = transcriber.transcribe_chunk(path, f"chunk_{i:04d}", i, session, stats,
+                                                  samples=samples, start_s=start_s)
+        update = transcriber.postprocess_transcript(transcript, start_s, f"chunk_{i:04d}", session, stats)
+        if update is not None:
+            tokens += _normalize(update["text"])
+        if start + chunk >= len(audio):
+            break
+    return stats, tokens, seams
+
+
+def reference_words(audio: np.ndarray, language: str) -> list:
+    """
+    Returns:
+        list: (token, start time) from a long-form decode of the whole recording
+    """
+    transcript = transcriber.transcribe_audio(audio.astype(np.float32) / 32768.0, beam_size=BEAM_SIZE,
+                                              language=language, word_timestamps=True)
+    return [(token, w["start"]) for s in transcript["segments"] for w in s["words"] for token in _normalize(w["word"])]
+
+
+def error_rates(reference: list, tokens: list, seams: list) -> tuple:
+    """
+    Returns:
+        tuple: (word error rate, error rate of reference words within SEAM_WINDOW_S of a seam)
+    """
+    if not reference:
+        return 0.0, 0.0
+    ref_tokens = [t for t, _ in reference]
+    times = np.array([start for _, start in reference])
+    seams = np.array(seams)
+    near_seam = (np.abs(times[:, None] - seams[None, :]).min(axis=1) <= SEAM_WINDOW_S if len(seams)
+                 else np.zeros(len(times), dtype=bool))
+
+    errors = seam_errors = 0
+    opcodes = SequenceMatcher(None, ref_tokens, tokens, autojunk=False).get_opcodes()
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            continue
+        count = max(i2 - i1, j2 - j1)
+        errors += count
+        # Insertions are placed at the reference word they follow
+        if near_seam[min(i1, len(times) - 1)] or near_seam[i1:i2].any():
+            seam_errors += count
+    return errors / len(ref_tokens), seam_errors / max(int(near_seam.sum()), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", help="16 kHz mono WAV with speech")
+    parser.add_argument("--model", default="small", help="faster-whisper model size or path")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--chunk", type=float, default=CHUNK_DURATION)
+    parser.add_argument("--overlap", type=float, default=OVERLAP_DURATION)
+    parser.add_argument("--synthetic-asr", action="store_true",
+                        help="Synthetic model and audio; measures ASR cost only (it ignores the prompt)")
+    parser.add_argument("--asr-rtf", type=float, default=0.3, help="Real-time factor of the synthetic model")
+    parser.add_argument("--minutes", type=float, default=10.0, help="Synthetic audio minutes")
+    args = parser.parse_args()
+
+    if args.synthetic_asr:
+        from core.soak import SyntheticWhisperModel, synthetic_frames
+        transcriber.set_model(SyntheticWhisperModel(rtf=args.asr_rtf))
+        frames = synthetic_frames(SAMPLE_RATE, int(FRAME_DURATION * SAMPLE_RATE))
+        audio = np.concatenate([next(frames) for _ in range(int(args.minutes * 60 / FRAME_DURATION))]).reshape(-1)
+    elif args.audio:
+        from faster_whisper import WhisperModel
+        transcriber.set_model(WhisperModel(args.model, device=args.device, compute_type=args.compute_type))
+        audio = load_wav(args.audio)
+    else:
+        parser.error("--audio is required unless --synthetic-asr is given")
+
+    reference = None if args.synthetic_asr else reference_words(audio, args.language)
+    audio_h = len(audio) / SAMPLE_RATE / 3600
+    print(f"{audio_h * 60:.1f} audio minutes, {args.chunk}s chunks")
+    print(f"{'mode':30}{'decoded':>9}{'ASR min/h':>11}{'dup tokens':>12}{'WER':>8}{'seam err':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for context_prompt, overlap in ((False, args.overlap), (True, 0.0)):
+            label = "context prompt, no overlap" if context_prompt else f"{overlap}s overlap"
+            stats, tokens, seams = run_mode(audio, args.chunk, overlap, context_prompt, args.language, workdir)
+            asr_per_hour, decoded_ratio = stats.asr_cost_summary()
+            _, duplicates, _ = stats.seam_summary()
+            if reference is None:  # Synthetic filler text: only the cost columns mean anything
+                quality = f"{'-':>12}{'-':>8}{'-':>10}"
+            else:
+                wer, seam_wer = error_rates(reference, tokens, seams)
+                quality = f"{duplicates:12d}{wer:8.1%}{seam_wer:10.1%}"
+            print(f"{label:30}{decoded_ratio:8.2f}x{asr_per_hour / 60:11.1f}" + quality)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_features.py
+"""
+Featurization CPU time per audio second: FeatureExtractor on every window
+(the model's own path) versus LogMelRing reusing frames across windows.
+
+Run from the project root:
+    python -m benchmarks.bench_features --minutes 5
+"""
+import argparse
+import time
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from config.config import SAMPLE_RATE, CHUNK_DURATION, OVERLAP_DURATION, STREAM_STEP_S, STREAM_MAX_BUFFER_S
+from core.features import LogMelRing
+
+
+def chunk_windows(total_samples: int, chunk_s: float, overlap_s: float):
+    chunk, step = int(chunk_s * SAMPLE_RATE), int((chunk_s - overlap_s) * SAMPLE_RATE)
+    return [(start, chunk) for start in range(0, total_samples - chunk + 1, step)]
+
+
+def stream_windows(total_samples: int, step_s: float, max_buffer_s: float):
+    """
+    Growing buffer re-decoded every step; once full, the oldest two thirds are
+    committed and trimmed (on a hop boundary, as StreamingTranscriber does).
+    """
+    step, max_buffer = int(step_s * SAMPLE_RATE), int(max_buffer_s * SAMPLE_RATE)
+    windows, start = [], 0
+    for end in range(step, total_samples + 1, step):
+        windows.append((start, end - start))
+        if end - start >= max_buffer:
+            start += (2 * (end - start) // 3) // 160 * 160
+    return windows
+
+
+def run(audio: np.ndarray, windows: list, featurize) -> tuple:
+    outputs = []
+    cpu_start = time.process_time()
+    for start, length in windows:
+        outputs.append(featurize(start, audio[start:start + length]))
+    return time.process_time() - cpu_start, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=5.0, help="Audio minutes per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    audio = rng.normal(0, 0.1, int(args.minutes * 60 * SAMPLE_RATE)).astype(np.float32)
+    audio_s = len(audio) / SAMPLE_RATE
+    extractor = FeatureExtractor()
+
+    scenarios = {
+        f"chunks {CHUNK_DURATION}s / {OVERLAP_DURATION}s overlap": chunk_windows(len(audio), CHUNK_DURATION, OVERLAP_DURATION),
+        f"streaming {STREAM_STEP_S}s step, {STREAM_MAX_BUFFER_S}s buffer": stream_windows(len(audio), STREAM_STEP_S, STREAM_MAX_BUFFER_S),
+    }
+    print(f"{audio_s / 60:.1f} audio minutes per scenario; CPU ms per audio second")
+    for name, windows in scenarios.items():
+        ring = LogMelRing(extractor.mel_filters)
+        full_cpu, full = run(audio, windows, lambda start, x: extractor(x))
+        ring_cpu, cached = run(audio, windows, ring.window)
+        max_diff = max(float(np.abs(a - b).max()) for a, b in zip(full, cached))
+        print(f"{name}: {len(windows)} windows")
+        print(f"  FeatureExtractor: {1000 * full_cpu / audio_s:7.2f} ms")
+        print(f"  LogMelRing:       {1000 * ring_cpu / audio_s:7.2f} ms  "
+              f"({full_cpu / max(ring_cpu, 1e-9):.1f}x, {ring.frames_reused / max(ring.frames_computed + ring.frames_reused, 1):.0%} "
+              f"frames reused, max abs diff {max_diff:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_transcript_index.py
+"""
+Load and query benchmark for TranscriptIndex over a synthetic multi-session corpus.
+
+Session journals are written to a temporary sessions directory. The search
+CLI loads that directory on every query, so load time is reported next to
+query latency: once re-indexing the journals (first load, which saves each
+session's postings), then reading the saved postings.
+
+Run from the project root:
+    python -m benchmarks.bench_transcript_index --sessions 300 --hours 2
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from core.transcript_index import TranscriptIndex, INDEX_FILENAME
+
+WORDS_PER_SECOND = 2.5
+STEP_S = 2.5  # new audio per chunk with the default 3s chunk / 0.5s overlap
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(2, 10))) for _ in range(size)]
+
+
+def zipf_sampler(vocab: list, rng: random.Random):
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocab))))
+    return lambda k: rng.choices(vocab, cum_weights=cum_weights, k=k)
+
+
+def write_journals(sessions_root: str, sessions: int, hours: float, sample):
+    chunks_per_session = int(hours * 3600 / STEP_S)
+    words_per_chunk = int(STEP_S * WORDS_PER_SECOND)
+    step_ms = int(STEP_S * 1000)
+    for s in range(sessions):
+        transcripts_dir = os.path.join(sessions_root, f"session-{s:05d}", "transcripts")
+        os.makedirs(transcripts_dir)
+        with open(os.path.join(transcripts_dir, INDEX_FILENAME), "w", encoding="utf-8") as f:
+            for c in range(chunks_per_session):
+                entry = {"chunk_id": f"chunk_{c + 1:04d}", "start_ms": c * step_ms, "end_ms": (c + 1) * step_ms,
+                         "text": " ".join(sample(words_per_chunk))}
+                f.write(json.dumps(entry) + "\n")
+
+
+def timed_load(sessions_root: str) -> tuple:
+    t0 = time.perf_counter()
+    index = TranscriptIndex.load(sessions_root)
+    return index, time.perf_counter() - t0
+
+
+def time_queries(index: TranscriptIndex, queries: list, limit: int) -> tuple:
+    timings, hits = [], 0
+    for q in queries:
+        t0 = time.perf_counter()
+        hits += len(index.search(q, limit=limit))
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    return statistics.mean(timings), p95, hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--hours", type=float, default=1.0, help="Audio hours per session")
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50, help="Hits per query, as in the search CLI; 0 for all")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = build_vocabulary(args.vocab, rng)
+    sample = zipf_sampler(vocab, rng)
+
+    with tempfile.TemporaryDirectory() as sessions_root:
+        write_journals(sessions_root, args.sessions, args.hours, sample)
+        _, rebuild_s = timed_load(sessions_root)
+        index, load_s = timed_load(sessions_root)
+    tokens = index.token_count()
+    print(f"{tokens:,} tokens across {args.sessions} sessions ({args.sessions * args.hours:.0f} audio hours)")
+    print(f"Load, re-indexing journals: {rebuild_s:6.2f}s ({tokens / rebuild_s:,.0f} tokens/s)")
+    print(f"Load, saved postings:       {load_s:6.2f}s ({tokens / load_s:,.0f} tokens/s)")
+    print(f"Each CLI query pays the load once; query latency below is on the loaded index "
+          f"({f'limit {args.limit}' if args.limit else 'all hits'}).")
+
+    workloads = {
+        "single word": [" ".join(sample(1)) for _ in range(args.queries)],
+        "phrase (2 words)": [" ".join(sample(2)) for _ in range(args.queries)],
+        "phrase (3 words)": [" ".join(sample(3)) for _ in range(args.queries)],
+        "prefix (3 chars)": [rng.choice(vocab)[:3] + "*" for _ in range(args.queries)],
+        "word + prefix": [f"{sample(1)[0]} {rng.choice(vocab)[:2]}*" for _ in range(args.queries)],
+    }
+    for name, queries in workloads.items():
+        mean_ms, p95_ms, avg_hits = time_queries(index, queries, args.limit or None)
+        print(f"{name:18s} mean {mean_ms:8.2f} ms | p95 {p95_ms:8.2f} ms | avg hits {avg_hits:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
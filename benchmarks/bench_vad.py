@@ -0,0 +1,176 @@
+# benchmarks/bench_vad.py
+"""
+Accuracy and throughput of the VAD backends on the same audio.
+
+Chunks are labelled speech / non-speech and classified the way the VAD stage
+does (voiced frame ratio >= SILENCE_THRESHOLD). The default corpus is
+synthetic: formant-shaped voiced speech with pauses and fricatives, alone and
+in noise, plus silence, white/pink noise and mains hum. It is built from the
+same cues the numpy backend tests (energy, zero crossings, spectral
+peakiness), so it checks that the backends behave sensibly but says nothing
+about accuracy on real speech. For that, add directories of 16 kHz mono WAV
+recordings.
+
+Throughput is measured for whole chunks and for FRAME_DURATION frames, as
+streaming mode would feed them, one per stream.
+
+Run from the project root:
+    python -m benchmarks.bench_vad --chunks 40 --streams 16
+    python -m benchmarks.bench_vad --speech-dir speech_wavs --noise-dir noise_wavs
+"""
+import argparse
+import glob
+import os
+import time
+import wave
+
+import numpy as np
+
+from config.config import SAMPLE_RATE, CHUNK_DURATION, FRAME_DURATION, SILENCE_THRESHOLD, VAD_MODE
+from core.vad import NumpyVadBackend, WebRtcVadBackend
+
+FORMANTS_HZ = ((700, 130), (1220, 70), (2600, 160))  # Centre, bandwidth of an open vowel
+
+
+def _scale(x: np.ndarray, dbfs: float) -> np.ndarray:
+    rms = np.sqrt(np.mean(x ** 2)) + 1e-12
+    return x * (10 ** (dbfs / 20) / rms)
+
+
+def synthetic_speech(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Voiced harmonics shaped by formants, in syllables with short pauses and fricative bursts.
+    """
+    t = np.arange(n) / SAMPLE_RATE
+    f0 = rng.uniform(100, 220) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = np.zeros(n)
+    for k in range(1, 30):
+        freq = k * f0.mean()
+        if freq > SAMPLE_RATE / 2:
+            break
+        gain = sum(1 / (1 + ((freq - fc) / bw) ** 2) for fc, bw in FORMANTS_HZ) + 0.02
+        voiced += gain * np.sin(k * phase) / k
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t + rng.uniform(0, np.pi)), 0, None) ** 0.7
+    fricatives = np.diff(rng.normal(0, 1, n + 1)) * (syllables < 0.05) * rng.uniform(0.02, 0.08)
+    return voiced * syllables + fricatives
+
+
+def pink_noise(n: int, rng: np.random.Generator) -> np.ndarray:
+    spectrum = np.fft.rfft(rng.normal(0, 1, n))
+    spectrum /= np.sqrt(np.maximum(np.fft.rfftfreq(n), 1.0 / n))
+    return np.fft.irfft(spectrum, n)
+
+
+def hum(n: int, rng: np.random.Generator) -> np.ndarray:
+    t = np.arange(n) / SAMPLE_RATE
+    base = rng.choice([50.0, 60.0])
+    return sum(np.sin(2 * np.pi * k * base * t + rng.uniform(0, np.pi)) / k for k in (1, 2, 3))
+
+
+def synthetic_corpus(per_condition: int, rng: np.random.Generator) -> dict:
+    """
+    Returns:
+        dict: condition -> (chunk label, int16 chunks)
+    """
+    n = int(CHUNK_DURATION * SAMPLE_RATE)
+    white = lambda: rng.normal(0, 1, n)
+
+    def speech(dbfs, noise=None):
+        return _scale(synthetic_speech(n, rng), dbfs) + (noise() if noise else 0)
+
+    conditions = {
+        "speech -25 dBFS": (True, lambda: speech(-25)),
+        "speech -40 dBFS": (True, lambda: speech(-40)),
+        "speech + white 10 dB SNR": (True, lambda: speech(-25, lambda: _scale(white(), -35))),
+        "speech + pink 5 dB SNR": (True, lambda: speech(-25, lambda: _scale(pink_noise(n, rng), -30))),
+        "silence": (False, lambda: _scale(white(), -75)),
+        "white noise -35 dBFS": (False, lambda: _scale(white(), -35)),
+        "pink noise -30 dBFS": (False, lambda: _scale(pink_noise(n, rng), -30)),
+        "mains hum -30 dBFS": (False, lambda: _scale(hum(n, rng), -30) + _scale(white(), -60)),
+    }
+    return {name: (label, [_to_int16(make()) for _ in range(per_condition)])
+            for name, (label, make) in conditions.items()}
+
+
+def _to_int16(x: np.ndarray) -> np.ndarray:
+    return (np.clip(x, -1, 1) * 32767).astype(np.int16)
+
+
+def wav_chunks(directory: str) -> list:
+    n = int(CHUNK_DURATION * SAMPLE_RATE)
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        with wave.open(path, "rb") as wf:
+            if wf.getframerate() != SAMPLE_RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                print(f"Skipping {path}: expected {SAMPLE_RATE} Hz mono int16")
+                continue
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        chunks += [audio[i:i + n] for i in range(0, len(audio) - n + 1, n)]
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=40, help="Synthetic chunks per condition")
+    parser.add_argument("--streams", type=int, default=16, help="Chunks per batch for the vectorized backend")
+    parser.add_argument("--mode", type=int, default=VAD_MODE)
+    parser.add_argument("--speech-dir", help="WAV files containing speech throughout")
+    parser.add_argument("--noise-dir", help="WAV files without speech")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.chunks, np.random.default_rng(args.seed))
+    if args.speech_dir:
+        corpus["recorded speech"] = (True, wav_chunks(args.speech_dir))
+    if args.noise_dir:
+        corpus["recorded non-speech"] = (False, wav_chunks(args.noise_dir))
+
+    backends = [WebRtcVadBackend(args.mode), NumpyVadBackend(args.mode)]
+    print(f"Chunk accuracy (voiced ratio >= {SILENCE_THRESHOLD}), mode {args.mode}, "
+          f"{CHUNK_DURATION}s chunks")
+    print("Synthetic conditions use the cues the numpy backend tests; they are a sanity check, "
+          "not a measure of accuracy on real speech.")
+    print(f"{'condition':28}" + "".join(f"{b.name:>10}" for b in backends) + f"{'agreement':>11}")
+    totals = {b.name: 0 for b in backends}
+    count = 0
+    for name, (label, chunks) in corpus.items():
+        if not chunks:
+            continue
+        correct, decisions = [], []
+        for backend in backends:
+            # One pass per backend: webrtcvad carries hangover state from call to call
+            per_chunk = [backend.frame_decisions(c, SAMPLE_RATE) for c in chunks]
+            ratios = np.array([d.mean() if len(d) else 0.0 for d in per_chunk])
+            hits = int(np.sum((ratios >= SILENCE_THRESHOLD) == label))
+            totals[backend.name] += hits
+            correct.append(hits / len(chunks))
+            decisions.append(np.concatenate(per_chunk))
+        count += len(chunks)
+        agreement = np.mean(decisions[0] == decisions[1])  # Frame-level
+        print(f"{name:28}" + "".join(f"{c:10.0%}" for c in correct) + f"{agreement:11.0%}")
+    print(f"{'overall (synthetic)':28}" + "".join(f"{totals[b.name] / count:10.1%}" for b in backends))
+
+    chunks = [c for _, cs in corpus.values() for c in cs]
+    frame_len = int(FRAME_DURATION * SAMPLE_RATE)
+    frames = [c[i:i + frame_len] for c in chunks[:args.streams * 4] for i in range(0, len(c) - frame_len + 1, frame_len)]
+    numpy_backend = backends[1]
+    print("\nThroughput, seconds of audio per CPU second")
+    for label, items in ((f"{CHUNK_DURATION}s chunks", chunks), (f"{FRAME_DURATION * 1000:.0f}ms frames", frames)):
+        audio_s = sum(len(c) for c in items) / SAMPLE_RATE
+        print(f"  {label} ({len(items)}, {audio_s / 60:.1f} audio minutes):")
+        for backend in backends:
+            print(f"    {backend.name:8} per call:             {audio_s / _cpu_time(backend.frame_decisions, items):10,.0f}x")
+        batches = [items[i:i + args.streams] for i in range(0, len(items), args.streams)]
+        print(f"    {numpy_backend.name:8} batch of {args.streams:3} streams: "
+              f"{audio_s / _cpu_time(numpy_backend.speech_ratios, batches):10,.0f}x")
+
+
+def _cpu_time(fn, items) -> float:
+    cpu = time.process_time()
+    for item in items:
+        fn(item, SAMPLE_RATE)
+    return time.process_time() - cpu
+
+if __name__ == "__main__":
+    main()
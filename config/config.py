@@ -13,8 +13,69 @@ AUDIO_FORMAT = np.int16
 
 # VAD & silence handling
 VAD_MODE = 1  # Aggressiveness: 0 (most sensitive) to 3 (least)
+VAD_BACKEND = "webrtc"  # "webrtc" (per-frame webrtcvad) or "numpy" (vectorized energy/flatness/ZCR)
 SILENCE_THRESHOLD = 0.25  # Ratio of voiced frames
 RMS_PREFILTER_THRESHOLD = 0.003  # RMS cutoff for float audio
 MIN_SILENCE_TO_LOG_S = 5.0  # Minimum silence duration to log a resume
 
+# Adaptive noise gate (applied on top of RMS_PREFILTER_THRESHOLD)
+ADAPTIVE_NOISE_GATE = True
+NOISE_GATE_MARGIN = 2.0  # Gate = noise floor * margin (~ +6 dB)
+NOISE_FLOOR_FALL_RATE = 0.2  # Per-frame smoothing towards quieter frames
+NOISE_FLOOR_RISE_RATE = 0.002  # Per-frame relative rise when frames are louder than the floor
+NOISE_FEEDBACK_DECAY = 0.0002  # Per-frame relative decay of the gate learned from non-speech chunks (half-life ~100 s)
+NO_SPEECH_FEEDBACK_PROB = 0.6  # ASR no_speech_prob that marks a gated-through chunk as noise
+
+# Pipeline
+FRAME_QUEUE_SIZE = 500  # Captured frames buffered before chunking (~15s at 30ms)
+STAGE_QUEUE_SIZE = 8  # Items buffered between downstream stages
+SHUTDOWN_DRAIN_TIMEOUT_S = 20.0  # Time allowed to finish in-flight chunks on shutdown
+MIN_FINAL_CHUNK_S = 0.5  # Shortest trailing audio flushed as a final chunk on shutdown
+
+# Streaming mode (replaces fixed chunks with a re-decoded growing buffer)
+STREAMING_MODE = False
+STREAM_STEP_S = 0.5  # New audio between re-decodes
+STREAM_MAX_BUFFER_S = 15.0  # Force-commit the hypothesis when the buffer grows past this
+STREAM_PROMPT_CHARS = 200  # Committed text passed back as decoding prompt
+
+# Context-prompted chunking (chunks without overlap; seam continuity comes from the decoding prompt)
+CONTEXT_PROMPT_MODE = False  # Overlap starts at 0 and the recently decoded text is passed as initial_prompt
+CONTEXT_PROMPT_CHARS = 200  # Most recent decoded text used as the prompt
+
+# ASR decoding
+BEAM_SIZE = 5
+INCREMENTAL_FEATURES = True  # Reuse log-mel frames across overlapping chunks and streaming re-decodes
+FEATURE_RING_S = 30.0  # Log-mel frames kept for reuse, in seconds of audio
+
+# Transcript event bus (partial / paragraph_update / paragraph_final fan-out to sinks)
+EVENT_QUEUE_SIZE = 100  # Default per-sink queue; a full queue drops events instead of blocking
+TRANSCRIPT_SINK_QUEUE_SIZE = 1000  # Queue of the final_transcript.txt writer
+SINK_DRAIN_TIMEOUT_S = 5.0  # Time sinks get to deliver queued events on shutdown
+EVENT_LOG_JSONL = False  # Also append every event to transcripts/events.jsonl
+
+# Latency auto-tuner (adjusts chunk length, overlap and beam size at runtime)
+AUTO_TUNE = False
+TARGET_LATENCY_S = 4.0  # Target end-to-end latency: chunk fill + queueing + ASR
+TUNE_INTERVAL_CHUNKS = 10  # Transcribed chunks between tuning decisions
+CHUNK_DURATION_BOUNDS = (1.5, 6.0)  # seconds
+OVERLAP_DURATION_BOUNDS = (0.2, 1.0)  # seconds
+BEAM_SIZE_BOUNDS = (1, 5)
+
+# Memory bounds for long-running sessions
+STATS_HISTORY_LIMIT = 10000  # Samples kept per SessionStats series; summaries cover this window
+PARAGRAPH_MAX_CHARS = 2000  # A paragraph is finalized once it grows past this
+TUNER_HISTORY_LIMIT = 500  # Auto-tuner adjustments kept in memory (all are logged)
+KEEP_AUDIO_CHUNKS = True  # False deletes each chunk's WAV once it has been transcribed
+
+# Soak testing (python -m core.soak)
+SOAK_MEMORY_BUDGET_MB_PER_HOUR = 5.0  # Max RSS growth per processed audio hour
+SOAK_SAMPLE_INTERVAL_MIN = 30.0  # Processed audio minutes between memory samples
+
+# Language detection
+LANGUAGE = None  # Fixed language code (e.g. "en"); None = auto-detect with lock-in
+LANGUAGE_LOCK_MIN_DETECTIONS = 5  # Consistent detections required to lock
+LANGUAGE_LOCK_MIN_PROBABILITY = 0.8  # Detection probability that counts towards the lock
+LANGUAGE_REPROBE_INTERVAL = 50  # Locked chunks between periodic re-probes
+LANGUAGE_REPROBE_LOGPROB = -1.0  # Avg segment logprob below which a locked chunk triggers a re-probe
+
 SAVE_PER_CHUNK_JSON = False
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field, fields
+import threading
+
+from config.config import CHUNK_DURATION, OVERLAP_DURATION, VAD_MODE, BEAM_SIZE
+
+
+@dataclass
+class RuntimeConfig:
+    """
+    Pipeline settings that may change while the process runs.
+
+    Initialized from config.config; stages read the current values for every
+    chunk, so updates take effect on the next chunk.
+    """
+    chunk_duration: float = CHUNK_DURATION
+    overlap_duration: float = OVERLAP_DURATION  # Set to 0 by build_pipeline for context-prompted sessions
+    vad_mode: int = VAD_MODE
+    beam_size: int = BEAM_SIZE
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+    def update(self, **changes) -> dict:
+        """
+        Applies changes atomically.
+
+        Returns:
+            dict: Previous values of the settings that actually changed
+        """
+        with self._lock:
+            for name in changes:
+                if name.startswith("_") or not hasattr(self, name):
+                    raise AttributeError(f"Unknown runtime setting: {name}")
+            chunk = changes.get("chunk_duration", self.chunk_duration)
+            overlap = changes.get("overlap_duration", self.overlap_duration)
+            if overlap >= chunk:
+                raise ValueError(f"overlap_duration ({overlap}s) must be < chunk_duration ({chunk}s)")
+
+            previous = {}
+            for name, value in changes.items():
+                if getattr(self, name) != value:
+                    previous[name] = getattr(self, name)
+                    setattr(self, name, value)
+            return previous
+
+    def step_duration(self) -> float:
+        with self._lock:
+            return self.chunk_duration - self.overlap_duration
+
+
+runtime_config = RuntimeConfig()
@@ -1,11 +1,17 @@
 import os
 from datetime import datetime
+from typing import Optional
+
+from config.config import LANGUAGE, KEEP_AUDIO_CHUNKS, CONTEXT_PROMPT_MODE
 
 class SessionManager:
-    def __init__(self):
+    def __init__(self, language: Optional[str] = LANGUAGE, prefix: str = "session"):
+        self.language = language  # Fixed ASR language for this session; None = detect
+        self.keep_audio_chunks = KEEP_AUDIO_CHUNKS
+        self.context_prompt_mode = CONTEXT_PROMPT_MODE  # Prompt each chunk with the preceding decoded text
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-        self.session_id = f"session-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        self.session_id = f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
         self.session_root = os.path.join(self.project_root, "sessions", self.session_id)
 
         self.audio_dir = os.path.join(self.session_root, "audio_chunks")
@@ -1,18 +1,48 @@
 from dataclasses import dataclass, field
 import threading
 import statistics
-from collections import Counter
+from collections import Counter, deque
+from itertools import islice
+from typing import Optional
+
+from config.config import STATS_HISTORY_LIMIT
+
+
+def _history():
+    # Per-sample series keep only the most recent STATS_HISTORY_LIMIT values
+    return deque(maxlen=STATS_HISTORY_LIMIT)
+
+
+def _tail(series, n: int) -> list:
+    return list(islice(reversed(series), n))
 
 @dataclass
 class SessionStats:
     saved_chunks: int = 0
     skipped_chunks: int = 0
-    transcription_latencies: list = field(default_factory=list)
-    chunk_durations: list = field(default_factory=list)
+    transcription_latencies: deque = field(default_factory=_history)
+    chunk_durations: deque = field(default_factory=_history)
     skip_reasons: Counter = field(default_factory=Counter)
+    gate_saved_asr_calls: int = 0
+    abandoned_items: Counter = field(default_factory=Counter)
+    real_time_factors: deque = field(default_factory=_history)  # ASR seconds per audio second, per decode
+    queue_depths: deque = field(default_factory=_history)  # ASR inbox depth, sampled per decode
+    first_word_latencies: deque = field(default_factory=_history)  # Speech onset -> first emitted word, per utterance
+    commit_lags: deque = field(default_factory=_history)  # Word audio end -> word committed
     detected_languages: Counter = field(default_factory=Counter)
     first_latency_recorded: bool = False
     first_latency_value: float = 0.0
+    language_probe_times: deque = field(default_factory=_history)  # Seconds spent detecting the language, per probe
+    probed_decodes: int = 0
+    locked_decodes: int = 0  # Decodes given a locked or configured language
+    sink_lags: dict = field(default_factory=dict)  # Sink name -> publish-to-handled delays
+    sink_delivered: Counter = field(default_factory=Counter)
+    sink_drops: Counter = field(default_factory=Counter)
+    asr_seconds: float = 0.0  # Total chunk decode time
+    asr_audio_s: float = 0.0  # Audio decoded, overlap included
+    asr_new_audio_s: float = 0.0  # Audio decoded for the first time
+    seam_tokens: int = 0  # Decoded tokens entering overlap deduplication
+    seam_duplicate_tokens: int = 0  # Tokens removed as repeats of earlier output
 
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
@@ -25,6 +55,14 @@ class SessionStats:
             self.skipped_chunks += 1
             self.skip_reasons[reason] += 1
 
+    def increment_gate_saved(self):
+        with self._lock:
+            self.gate_saved_asr_calls += 1
+
+    def add_abandoned(self, stage: str, count: int):
+        with self._lock:
+            self.abandoned_items[stage] += count
+
     def add_latency(self, value: float):
         with self._lock:
             self.transcription_latencies.append(value)
@@ -32,6 +70,105 @@ class SessionStats:
                 self.first_latency_value = value
                 self.first_latency_recorded = True
 
+    def add_real_time_factor(self, latency: float, audio_duration: float):
+        if audio_duration <= 0:
+            return
+        with self._lock:
+            self.real_time_factors.append(latency / audio_duration)
+
+    def add_asr_cost(self, latency: float, audio_s: float, new_audio_s: float):
+        with self._lock:
+            self.asr_seconds += latency
+            self.asr_audio_s += audio_s
+            self.asr_new_audio_s += new_audio_s
+
+    def asr_cost_summary(self):
+        """
+        Returns:
+            tuple: (ASR seconds per hour of new audio, audio decoded per second of new audio)
+        """
+        with self._lock:
+            if self.asr_new_audio_s <= 0:
+                return 0.0, 0.0
+            return (3600.0 * self.asr_seconds / self.asr_new_audio_s,
+                    self.asr_audio_s / self.asr_new_audio_s)
+
+    def add_seam_tokens(self, decoded: int, removed: int):
+        with self._lock:
+            self.seam_tokens += decoded
+            self.seam_duplicate_tokens += removed
+
+    def seam_summary(self):
+        """
+        Returns:
+            tuple: (decoded tokens, tokens removed as duplicates, removed fraction)
+        """
+        with self._lock:
+            rate = self.seam_duplicate_tokens / self.seam_tokens if self.seam_tokens else 0.0
+            return self.seam_tokens, self.seam_duplicate_tokens, rate
+
+    def record_queue_depth(self, depth: int):
+        with self._lock:
+            self.queue_depths.append(depth)
+
+    def recent_load(self, window: int):
+        """
+        Returns:
+            tuple: (mean real-time factor, mean queue depth) over the last `window` samples
+        """
+        with self._lock:
+            rtfs = _tail(self.real_time_factors, window)
+            depths = _tail(self.queue_depths, window)
+            return (sum(rtfs) / len(rtfs) if rtfs else 0.0,
+                    sum(depths) / len(depths) if depths else 0.0)
+
+    def add_first_word_latency(self, value: float):
+        with self._lock:
+            self.first_word_latencies.append(value)
+
+    def add_commit_lag(self, value: float):
+        with self._lock:
+            self.commit_lags.append(value)
+
+    def streaming_summary(self):
+        """
+        Returns:
+            tuple: (avg time-to-first-word, avg commit lag, p95 commit lag), in seconds
+        """
+        with self._lock:
+            ttfw = sum(self.first_word_latencies) / len(self.first_word_latencies) if self.first_word_latencies else 0.0
+            if not self.commit_lags:
+                return ttfw, 0.0, 0.0
+            lags = sorted(self.commit_lags)
+            return ttfw, sum(lags) / len(lags), lags[int(0.95 * (len(lags) - 1))]
+
+    def add_sink_lag(self, sink: str, value: float):
+        with self._lock:
+            if sink not in self.sink_lags:
+                self.sink_lags[sink] = _history()
+            self.sink_lags[sink].append(value)
+            self.sink_delivered[sink] += 1
+
+    def add_sink_drop(self, sink: str):
+        with self._lock:
+            self.sink_drops[sink] += 1
+
+    def sink_summary(self) -> dict:
+        """
+        Returns:
+            dict: sink name -> (events delivered, events dropped, avg lag, p95 lag, max lag), lags in seconds
+        """
+        with self._lock:
+            summary = {}
+            for sink in set(self.sink_lags) | set(self.sink_drops):
+                lags = sorted(self.sink_lags.get(sink, ()))
+                if lags:
+                    lag_stats = (sum(lags) / len(lags), lags[int(0.95 * (len(lags) - 1))], lags[-1])
+                else:
+                    lag_stats = (0.0, 0.0, 0.0)
+                summary[sink] = (self.sink_delivered[sink], self.sink_drops[sink]) + lag_stats
+            return summary
+
     def add_chunk_duration(self, value: float):
         with self._lock:
             self.chunk_durations.append(value)
@@ -40,6 +177,30 @@ class SessionStats:
         with self._lock:
             self.detected_languages[lang] += 1
 
+    def add_language_decode(self, language_given: bool, probe_s: Optional[float] = None):
+        with self._lock:
+            if language_given:
+                self.locked_decodes += 1
+            else:
+                self.probed_decodes += 1
+                if probe_s is not None:
+                    self.language_probe_times.append(probe_s)
+
+    def detection_time_saved(self):
+        """
+        Estimates the ASR time saved by skipping language detection, from the
+        measured duration of the probes that ran.
+
+        Returns:
+            tuple: (mean seconds per probe, total seconds saved on locked decodes, probes timed);
+                zeros when no probe was timed, e.g. with a configured language
+        """
+        with self._lock:
+            if not self.language_probe_times:
+                return 0.0, 0.0, 0
+            per_probe = sum(self.language_probe_times) / len(self.language_probe_times)
+            return per_probe, per_probe * self.locked_decodes, len(self.language_probe_times)
+
     def latency_summary(self):
         with self._lock:
             if not self.transcription_latencies:
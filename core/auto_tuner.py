@@ -0,0 +1,130 @@
+# core/auto_tuner.py
+import time
+from collections import deque
+
+from config.config import (
+    TARGET_LATENCY_S, TUNE_INTERVAL_CHUNKS, TUNER_HISTORY_LIMIT,
+    CHUNK_DURATION_BOUNDS, OVERLAP_DURATION_BOUNDS, BEAM_SIZE_BOUNDS, CONTEXT_PROMPT_MODE
+)
+from config.runtime import runtime_config as default_runtime_config
+
+CHUNK_STEP_S = 0.5
+OVERLAP_STEP_S = 0.1
+
+
+def _clamp(value, bounds):
+    return max(bounds[0], min(bounds[1], value))
+
+
+class LatencyAutoTuner:
+    """
+    Adjusts chunk length, overlap and beam size to meet a target end-to-end latency.
+
+    Every `interval` transcribed chunks it reads the recent real-time factor (RTF)
+    and ASR queue depth from SessionStats and estimates:
+
+        utilization = RTF * chunk / step      (> 1 means ASR cannot keep up)
+        latency     = chunk + RTF * chunk * (1 + queue depth)
+
+    At most one adjustment is made per decision, in this order of preference:
+    - overloaded (utilization > 0.9 or a growing queue): lower beam size, then
+      overlap. Both cut ASR work without adding latency.
+    - still overloaded with utilization > 1: lengthen chunks to amortize per-call
+      overhead. This raises latency by CHUNK_STEP_S, but below that point the
+      queue, and with it latency, grows without bound.
+    - over the latency target: shorten chunks if ASR has headroom, else lower beam
+    - within target with ASR headroom (utilization < 0.5): raise beam size for accuracy
+
+    Resizing a chunk keeps the current overlap (at most half the chunk), so
+    overlap reductions are not undone. With `context_prompt` (the session's
+    context prompt mode) the overlap stays at 0.
+
+    Every adjustment is logged; the most recent ones are kept in `history`.
+    """
+    def __init__(self, stats, config=default_runtime_config, target_latency_s: float = TARGET_LATENCY_S,
+                 interval: int = TUNE_INTERVAL_CHUNKS, context_prompt: bool = CONTEXT_PROMPT_MODE, logger=None):
+        self.stats = stats
+        self.config = config
+        self.context_prompt = context_prompt
+        self.target_latency_s = target_latency_s
+        self.interval = interval
+        self.logger = logger
+        self.history = deque(maxlen=TUNER_HISTORY_LIMIT)
+        self._chunks_since_decision = 0
+
+    @staticmethod
+    def estimate(rtf: float, depth: float, chunk: float, overlap: float):
+        step = max(chunk - overlap, 1e-3)
+        asr_s = rtf * chunk
+        return asr_s / step, chunk + asr_s * (1 + depth)
+
+    def observe(self):
+        """
+        Called after each transcribed chunk; makes a decision every `interval` chunks.
+        """
+        self._chunks_since_decision += 1
+        if self._chunks_since_decision < self.interval:
+            return
+        self._chunks_since_decision = 0
+
+        rtf, depth = self.stats.recent_load(self.interval)
+        settings = self.config.snapshot()
+        utilization, latency = self.estimate(rtf, depth, settings["chunk_duration"], settings["overlap_duration"])
+        changes, reason = self._decide(rtf, depth, utilization, latency, settings)
+        if not changes:
+            return
+
+        try:
+            previous = self.config.update(**changes)
+        except ValueError as e:
+            if self.logger:
+                self.logger.warning(f"Auto-tuner: rejected {changes}: {e}")
+            return
+        if not previous:
+            return
+
+        entry = {
+            "time": time.time(), "reason": reason, "rtf": rtf, "queue_depth": depth,
+            "utilization": utilization, "est_latency_s": latency,
+            "changes": {name: (old, changes[name]) for name, old in previous.items()},
+        }
+        self.history.append(entry)
+        if self.logger:
+            change_str = ", ".join(f"{name} {old} -> {new}" for name, (old, new) in entry["changes"].items())
+            self.logger.info(f"Auto-tuner: {change_str} | {reason} | rtf={rtf:.2f} queue={depth:.1f} "
+                             f"util={utilization:.2f} est_latency={latency:.2f}s target={self.target_latency_s:.2f}s")
+
+    def _decide(self, rtf, depth, utilization, latency, settings):
+        chunk = settings["chunk_duration"]
+        overlap = settings["overlap_duration"]
+        beam = settings["beam_size"]
+
+        if utilization > 0.9 or depth >= 2:
+            if beam > BEAM_SIZE_BOUNDS[0]:
+                return {"beam_size": beam - 1}, "overloaded"
+            if overlap > OVERLAP_DURATION_BOUNDS[0]:
+                return {"overlap_duration": round(_clamp(overlap - OVERLAP_STEP_S, OVERLAP_DURATION_BOUNDS), 2)}, "overloaded"
+            if utilization > 1 and chunk < CHUNK_DURATION_BOUNDS[1]:
+                return self._resize_chunk(chunk + CHUNK_STEP_S, overlap), "overloaded"
+            return {}, ""
+
+        if latency > self.target_latency_s:
+            shorter = _clamp(chunk - CHUNK_STEP_S, CHUNK_DURATION_BOUNDS)
+            resized = self._resize_chunk(shorter, overlap)
+            new_util, _ = self.estimate(rtf, 0, shorter, resized["overlap_duration"])
+            if shorter < chunk and new_util < 0.8:
+                return resized, "over latency target"
+            if beam > BEAM_SIZE_BOUNDS[0]:
+                return {"beam_size": beam - 1}, "over latency target"
+            return {}, ""
+
+        if utilization < 0.5 and beam < BEAM_SIZE_BOUNDS[1]:
+            return {"beam_size": beam + 1}, "latency headroom"
+
+        return {}, ""
+
+    def _resize_chunk(self, chunk: float, overlap: float) -> dict:
+        chunk = round(_clamp(chunk, CHUNK_DURATION_BOUNDS), 2)
+        if self.context_prompt:
+            return {"chunk_duration": chunk, "overlap_duration": 0.0}
+        return {"chunk_duration": chunk, "overlap_duration": min(overlap, round(chunk / 2, 2))}
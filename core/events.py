@@ -0,0 +1,177 @@
+# core/events.py
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional
+
+from config.config import EVENT_QUEUE_SIZE
+
+# Event kinds
+PARTIAL = "partial"  # Streaming hypothesis beyond the committed text; replaced by the next one
+PARAGRAPH_UPDATE = "paragraph_update"  # The open paragraph grew; `text` is the whole paragraph so far
+PARAGRAPH_FINAL = "paragraph_final"  # The paragraph is complete and will not change again
+
+# Drop policies when a subscriber's queue is full
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+@dataclass(frozen=True)
+class TranscriptEvent:
+    kind: str
+    session_id: str
+    paragraph_id: int
+    text: str  # Whole paragraph for paragraph events, the hypothesis for partials
+    delta: str  # Text added by this update
+    start: float  # Global session time, in seconds
+    end: float
+    chunk_id: str
+    created: float = field(default_factory=time.time)
+
+
+class Subscription:
+    """
+    One subscriber: a bounded queue drained by its own thread.
+
+    `offer` never blocks. When the queue is full the drop policy decides which
+    event is lost, and the drop is counted. Events offered after `close` are
+    dropped and counted too. Delivery lag (publish -> handled) is recorded per
+    subscriber in SessionStats.
+    """
+    def __init__(self, name: str, handler: Callable[[TranscriptEvent], None], kinds: Optional[Iterable[str]] = None,
+                 maxsize: int = EVENT_QUEUE_SIZE, drop_policy: str = DROP_OLDEST, stats=None, logger=None):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        self.handler = handler
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self.stats = stats
+        self.logger = logger
+        self.delivered = 0
+        self.dropped = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"sink-{name}")
+
+    def wants(self, event: TranscriptEvent) -> bool:
+        return self.kinds is None or event.kind in self.kinds
+
+    def offer(self, event: TranscriptEvent) -> bool:
+        """
+        Returns:
+            bool: False if the event itself was dropped
+        """
+        with self._cond:
+            dropped = self._closing or len(self._queue) >= self.maxsize
+            accepted = not self._closing and not (dropped and self.drop_policy == DROP_NEWEST)
+            if dropped:
+                self.dropped += 1
+            if accepted:
+                if dropped:  # DROP_OLDEST on a full queue
+                    self._queue.popleft()
+                self._queue.append(event)
+                self._cond.notify()
+        if dropped and self.stats is not None:
+            self.stats.add_sink_drop(self.name)
+        return accepted
+
+    def backlog(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                event = self._queue.popleft()
+            try:
+                self.handler(event)
+                self.delivered += 1
+                if self.stats is not None:
+                    self.stats.add_sink_lag(self.name, time.time() - event.created)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Sink {self.name} failed on {event.kind} event: {e}", exc_info=True)
+
+    def close(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+
+
+class EventBus:
+    """
+    In-process fan-out of transcript events.
+
+    Publishing only appends to each interested subscriber's queue, so a slow
+    or stuck sink cannot stall transcription; it loses events instead,
+    according to its own drop policy.
+    """
+    def __init__(self, stats=None, logger=None):
+        self.stats = stats
+        self.logger = logger
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def subscribe(self, name: str, handler: Callable[[TranscriptEvent], None], kinds: Optional[Iterable[str]] = None,
+                  maxsize: int = EVENT_QUEUE_SIZE, drop_policy: str = DROP_OLDEST) -> Subscription:
+        subscription = Subscription(name, handler, kinds=kinds, maxsize=maxsize, drop_policy=drop_policy,
+                                    stats=self.stats, logger=self.logger)
+        with self._lock:
+            if name in self.subscriptions:
+                raise ValueError(f"Sink already subscribed: {name}")
+            self.subscriptions[name] = subscription
+        subscription.thread.start()
+        if self.logger:
+            self.logger.info(f"Sink subscribed: {name} (queue {maxsize}, {drop_policy}, "
+                             f"kinds: {', '.join(sorted(subscription.kinds)) if subscription.kinds else 'all'})")
+        return subscription
+
+    def publish(self, event: TranscriptEvent):
+        with self._lock:
+            subscriptions = list(self.subscriptions.values())
+        for subscription in subscriptions:
+            if subscription.wants(event):
+                subscription.offer(event)
+
+    def backlogs(self) -> dict:
+        with self._lock:
+            return {name: s.backlog() for name, s in self.subscriptions.items()}
+
+    def close(self, deadline_s: float) -> int:
+        """
+        Lets every sink drain its queue for up to `deadline_s` seconds.
+        Only the first call does anything.
+
+        Returns:
+            int: Number of events left undelivered
+        """
+        with self._lock:
+            if self._closed:
+                return 0
+            self._closed = True
+            subscriptions = list(self.subscriptions.values())
+        for subscription in subscriptions:
+            subscription.close()
+        end_time = time.monotonic() + deadline_s
+        for subscription in subscriptions:
+            subscription.thread.join(timeout=max(0.0, end_time - time.monotonic()))
+
+        total = 0
+        for subscription in subscriptions:
+            lost = subscription.backlog() if subscription.thread.is_alive() else 0
+            if lost:
+                total += lost
+                if self.logger:
+                    self.logger.warning(f"Sink {subscription.name} abandoned {lost} event(s) at shutdown.")
+                if self.stats is not None:
+                    self.stats.add_abandoned(f"sink:{subscription.name}", lost)
+        return total
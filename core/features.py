@@ -0,0 +1,143 @@
+# core/features.py
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+from config.config import INCREMENTAL_FEATURES, FEATURE_RING_S
+
+
+class LogMelRing:
+    """
+    Whisper log-mel features computed once per hop and reused across windows.
+
+    Frames are keyed by their global hop index (sample offset // hop_length), so
+    the overlap of consecutive chunks, or a streaming buffer that is re-decoded
+    as it grows, only featurizes new audio. A frame is cached only when its FFT
+    window lies inside the audio it was computed from; edge frames depend on the
+    window's padding and are recomputed every time. The result therefore matches
+    WhisperModel's own FeatureExtractor for the same audio.
+
+    The ring holds `capacity_s` of frames; older frames are overwritten.
+    """
+    def __init__(self, mel_filters: np.ndarray, sample_rate: int = 16000, n_fft: int = 400,
+                 hop_length: int = 160, capacity_s: float = FEATURE_RING_S):
+        self.mel_filters = np.asarray(mel_filters, dtype=np.float32)
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.capacity = int(capacity_s * sample_rate / hop_length)
+        self.window_fn = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+        self._frames = np.zeros((len(self.mel_filters), self.capacity), dtype=np.float32)  # log10 mel power
+        self._slot_frame = np.full(self.capacity, -1, dtype=np.int64)  # Global frame held by each slot
+        self._lock = threading.Lock()
+        self.frames_computed = 0
+        self.frames_reused = 0
+
+    def window(self, start_sample: int, audio: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Log-mel features of `audio`, as FeatureExtractor(audio) computes them.
+
+        Args:
+            start_sample (int): Global sample index of audio[0]
+            audio (np.ndarray): int16 or float32 mono samples
+
+        Returns:
+            np.ndarray: (n_mels, frames) float32, or None if the audio is not hop-aligned or too short
+        """
+        if start_sample % self.hop_length or len(audio) < self.n_fft:
+            return None
+        x = _to_float32(audio)
+        n = len(x)
+        half = self.n_fft // 2
+        n_frames = (n + self.hop_length) // self.hop_length  # FeatureExtractor drops the last STFT frame
+        first = start_sample // self.hop_length
+
+        # Frames whose FFT window is fully inside the audio do not depend on padding
+        lo = -(-half // self.hop_length)
+        hi = max(lo, min(n_frames, (n - half) // self.hop_length + 1))
+        interior = np.arange(lo, hi)
+        global_idx = first + interior
+        slots = global_idx % self.capacity
+
+        log_spec = np.empty((len(self.mel_filters), n_frames), dtype=np.float32)
+        with self._lock:
+            cached = self._slot_frame[slots] == global_idx
+            log_spec[:, interior[cached]] = self._frames[:, slots[cached]]
+
+        missing = np.concatenate([np.arange(lo), interior[~cached], np.arange(hi, n_frames)])
+        padded = np.pad(np.pad(x, (0, self.hop_length)), (half, half), mode="reflect")
+        log_spec[:, missing] = self._log_mel(padded, missing)
+
+        new = interior[~cached]
+        with self._lock:
+            new_slots = (first + new) % self.capacity
+            self._frames[:, new_slots] = log_spec[:, new]
+            self._slot_frame[new_slots] = first + new
+            self.frames_computed += len(missing)
+            self.frames_reused += int(cached.sum())
+
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
+
+    def _log_mel(self, padded: np.ndarray, frame_idx: np.ndarray) -> np.ndarray:
+        if len(frame_idx) == 0:
+            return np.empty((len(self.mel_filters), 0), dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.hop_length]
+        # Missing frames are mostly contiguous runs; slicing the strided view avoids a gather copy
+        run_starts = np.flatnonzero(np.diff(frame_idx, prepend=-2) != 1)
+        run_ends = np.append(run_starts[1:], len(frame_idx))
+        runs = [frames[frame_idx[a]:frame_idx[b - 1] + 1] for a, b in zip(run_starts, run_ends)]
+        windows = runs[0] if len(runs) == 1 else np.concatenate(runs)
+        spectrum = np.fft.rfft(windows * self.window_fn, axis=-1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        mel = power @ self.mel_filters.T
+        return np.log10(np.clip(mel, 1e-10, None)).T
+
+
+class PrecomputedFeatureExtractor:
+    """
+    Wraps WhisperModel's FeatureExtractor so `transcribe` can use features
+    computed elsewhere: audio registered with `provide()` is not featurized again.
+    Everything else is delegated to the wrapped extractor.
+    """
+    def __init__(self, extractor):
+        self._extractor = extractor
+        self._provided = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self._extractor, name)
+
+    @contextmanager
+    def provide(self, audio: np.ndarray, features: np.ndarray):
+        self._provided.item = (audio, features)
+        try:
+            yield
+        finally:
+            self._provided.item = None
+
+    def __call__(self, waveform: np.ndarray, padding=160, chunk_length=None):
+        item = getattr(self._provided, "item", None)
+        if item is not None and item[0] is waveform and padding == 160 and chunk_length is None:
+            return item[1]
+        return self._extractor(waveform, padding=padding, chunk_length=chunk_length)
+
+
+def _to_float32(audio: np.ndarray) -> np.ndarray:
+    audio = audio.reshape(-1)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32, copy=False)
+
+
+def create_feature_ring(asr_model, sample_rate: int) -> Optional[LogMelRing]:
+    """
+    Returns a LogMelRing matching the model's feature extractor, or None if
+    incremental features are disabled or the model exposes no extractor.
+    """
+    extractor = getattr(asr_model, "feature_extractor", None)
+    if not INCREMENTAL_FEATURES or extractor is None or extractor.sampling_rate != sample_rate:
+        return None
+    return LogMelRing(extractor.mel_filters, sample_rate=sample_rate,
+                      n_fft=extractor.n_fft, hop_length=extractor.hop_length)
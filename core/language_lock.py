@@ -0,0 +1,94 @@
+# core/language_lock.py
+from typing import Optional
+
+from config.config import (
+    LANGUAGE_LOCK_MIN_DETECTIONS, LANGUAGE_LOCK_MIN_PROBABILITY,
+    LANGUAGE_REPROBE_INTERVAL, LANGUAGE_REPROBE_LOGPROB
+)
+
+
+class LanguageLock:
+    """
+    Decides per chunk whether the ASR model has to detect the language.
+
+    Starts in probing mode (language=None). After `min_detections` consecutive
+    detections of the same language with probability >= `min_probability` the
+    language is locked and passed to the model, which skips detection. While
+    locked, a re-probe is scheduled every `reprobe_interval` chunks, or right
+    away when a locked decode comes back with an average logprob below
+    `reprobe_logprob`. A re-probe that disagrees or is unsure releases the lock.
+
+    With `fixed_language` set, detection is never run.
+    """
+    def __init__(
+        self,
+        fixed_language: Optional[str] = None,
+        min_detections: int = LANGUAGE_LOCK_MIN_DETECTIONS,
+        min_probability: float = LANGUAGE_LOCK_MIN_PROBABILITY,
+        reprobe_interval: int = LANGUAGE_REPROBE_INTERVAL,
+        reprobe_logprob: float = LANGUAGE_REPROBE_LOGPROB,
+        logger=None
+    ):
+        self.fixed_language = fixed_language
+        self.min_detections = min_detections
+        self.min_probability = min_probability
+        self.reprobe_interval = reprobe_interval
+        self.reprobe_logprob = reprobe_logprob
+        self.logger = logger
+
+        self.locked_language: Optional[str] = None
+        self._streak_language: Optional[str] = None
+        self._streak = 0
+        self._chunks_since_probe = 0
+        self._reprobe_requested = False
+
+    def next_language(self) -> Optional[str]:
+        """
+        Returns the language to decode the next chunk with, or None to detect it.
+        """
+        if self.fixed_language:
+            return self.fixed_language
+        if self.locked_language is None:
+            return None
+        if self._reprobe_requested or self._chunks_since_probe >= self.reprobe_interval:
+            return None
+        self._chunks_since_probe += 1
+        return self.locked_language
+
+    def observe(self, language: str, probability: float, avg_logprob: Optional[float], probed: bool):
+        """
+        Feeds back the result of a decode made with the language from `next_language`.
+        """
+        if self.fixed_language:
+            return
+
+        if not probed:
+            if avg_logprob is not None and avg_logprob < self.reprobe_logprob:
+                self._reprobe_requested = True
+                if self.logger:
+                    self.logger.info(f"Language lock: low confidence (avg_logprob={avg_logprob:.2f}), "
+                                     f"re-probing on next chunk.")
+            return
+
+        self._chunks_since_probe = 0
+        self._reprobe_requested = False
+
+        confident = probability >= self.min_probability
+        if confident and language == self._streak_language:
+            self._streak += 1
+        elif confident:
+            self._streak_language = language
+            self._streak = 1
+        else:
+            self._streak = 0
+
+        if self.locked_language is not None:
+            if not confident or language != self.locked_language:
+                if self.logger:
+                    self.logger.info(f"Language lock released: re-probe found '{language}' "
+                                     f"(p={probability:.2f}), was locked to '{self.locked_language}'.")
+                self.locked_language = None
+        elif self._streak >= self.min_detections:
+            self.locked_language = language
+            if self.logger:
+                self.logger.info(f"Language locked to '{language}' after {self._streak} consistent detections.")
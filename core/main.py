@@ -1,59 +1,28 @@
 # main.py
 import os
 import threading
-import time
-import queue
 from datetime import datetime
 
 from audio.input_device import select_input_device
 from audio.audio_input import AudioInputManager
-from audio.chunk_processor import chunk_processor
 from core.logger import setup_logger
+from core.session_pipeline import build_pipeline, build_streaming_pipeline
+from core.sinks import close_event_bus
+from core.transcript_index import INDEX_FILENAME, persist_session_index
 from config.session_stats import SessionStats
 from config.session import SessionManager
-from config.config import SAMPLE_RATE as CONFIG_APP_SAMPLE_RATE
-from transcriber import send_to_asr
+from config.config import SAMPLE_RATE as CONFIG_APP_SAMPLE_RATE, SHUTDOWN_DRAIN_TIMEOUT_S, STREAMING_MODE
+from config.runtime import runtime_config
+from core.transcriber import load_model
 
 
 # Shutdown flag
 shutdown_event = threading.Event()
-transcription_queue = queue.Queue()
-
-def transcriber_worker(transcription_queue, session, stats, shutdown_event, logger):
-    """
-    Background worker that receives audio chunk filepaths,
-    transcribes them, and handles paragraph-mode writing with final flush.
-    """
-    while not shutdown_event.is_set():
-        try:
-            filepath, chunk_id, chunk_index = transcription_queue.get(timeout=1)
-            send_to_asr(filepath, chunk_id, chunk_index, session, stats, logger)
-        except queue.Empty:
-            continue
-        except Exception as e:
-            if logger:
-                logger.error(f"Transcriber worker error: {e}", exc_info=True)
-
-    # Fallback: Final paragraph flush at shutdown
-    if hasattr(session, "paragraph_buffer") and session.paragraph_buffer:
-        final_text = " ".join(session.paragraph_buffer).strip()
-        timestamp = getattr(session, "paragraph_start_time", 0.0)
-        final_line = f"[{timestamp:.2f}] {final_text}"
-        final_path = os.path.join(session.transcript_dir, "final_transcript.txt")
-
-        try:
-            with open(final_path, "a", encoding="utf-8") as f:
-                f.write(final_line + "\n\n")
-            if logger:
-                logger.info("Final paragraph flushed at shutdown.")
-        except Exception as e:
-            if logger:
-                logger.error(f"Failed to flush final paragraph: {e}", exc_info=True)
 
 def main():
     """
     Main entry point of the application. Handles device selection,
-    launches audio input stream and background chunk processing thread.
+    launches the audio input stream and the processing pipeline.
     """
     session = SessionManager()
     logger = setup_logger(session.session_id, session.log_dir)
@@ -68,29 +37,16 @@ def main():
     logger.info(f"Selected device index: {device_index} (Native SR: {device_native_sample_rate} Hz). "
                 f"Application will attempt to use configured sample rate: {app_sample_rate} Hz.")
 
+    logger.info("Loading ASR model...")
+    load_model()
+
     audio_manager = AudioInputManager(app_sample_rate, device_index, logger)
     stats = SessionStats()
     session_start = datetime.now()
 
-    # Start chunk processor thread
-    processor_thread = threading.Thread(
-        target=chunk_processor,
-        args=(app_sample_rate, shutdown_event, stats, audio_manager, session, logger, transcription_queue),
-        daemon=True,
-        name="ChunkProcessor",
-    )
-    processor_thread.start()
-    logger.info("Chunk processor thread started.")
-
-    # Start transcriber thread
-    transcriber_thread = threading.Thread(
-        target=transcriber_worker,
-        args=(transcription_queue, session, stats, shutdown_event, logger),
-        daemon=True,
-        name="TranscriberWorker",
-    )
-    transcriber_thread.start()
-    logger.info("Transcriber thread started.")
+    build = build_streaming_pipeline if STREAMING_MODE else build_pipeline
+    pipeline = build(app_sample_rate, audio_manager, session, stats, logger)
+    pipeline.start()
 
     stream = None
     try:
@@ -108,8 +64,9 @@ def main():
             logger.error(f"Failed to start audio input stream: {e}", exc_info=True)
             return
 
-        while not shutdown_event.is_set():
-            time.sleep(0.1)
+        # A wait without timeout cannot be interrupted by Ctrl+C on Windows
+        while not shutdown_event.wait(0.5):
+            pass
 
     except KeyboardInterrupt:
         logger.info("Interrupted by user. Signaling shutdown...")
@@ -128,23 +85,20 @@ def main():
             except Exception as e:
                 logger.error(f"Error stopping/closing audio stream: {e}", exc_info=True)
 
-        if processor_thread.is_alive():
-            logger.info("Waiting for chunk processor thread to join...")
-            processor_thread.join(timeout=5.0)
-            if processor_thread.is_alive():
-                logger.warning("Chunk processor thread did not join in time.")
-            else:
-                logger.info("Chunk processor thread joined.")
-
-        if transcriber_thread.is_alive():
-            logger.info("Waiting for transcriber thread to join...")
-            transcriber_thread.join(timeout=5.0)
-            if transcriber_thread.is_alive():
-                logger.warning("Transcriber thread did not join in time.")
-            else:
-                logger.info("Transcriber thread joined.")
+        abandoned = pipeline.shutdown(SHUTDOWN_DRAIN_TIMEOUT_S)
+        abandoned += close_event_bus(session)
 
-        logger.info("All threads shut down cleanly.")
+        # Saves the session's postings so the first search does not re-index its journal
+        journal_path = os.path.join(session.transcript_dir, INDEX_FILENAME)
+        if os.path.exists(journal_path):
+            try:
+                persist_session_index(journal_path, session.session_id, logger)
+            except Exception as e:
+                logger.error(f"Failed to index session transcript: {e}", exc_info=True)
+        if abandoned:
+            logger.warning(f"Pipeline shut down with {abandoned} abandoned item(s).")
+        else:
+            logger.info("All threads shut down cleanly.")
 
         session_end = datetime.now()
         duration = session_end - session_start
@@ -152,6 +106,7 @@ def main():
         avg_latency, min_latency, max_latency, stddev_latency = stats.latency_summary()
         avg_duration = stats.average_chunk_duration()
         most_lang, most_lang_count = stats.most_common_language()
+        probe_s, saved_total, probes_timed = stats.detection_time_saved()
         skip_reasons_str = ", ".join(f"{k}: {v}" for k, v in stats.skip_reasons.items())
 
         logger.info("===== SESSION SUMMARY =====")
@@ -161,11 +116,40 @@ def main():
         logger.info(f"Duration:   {duration}")
         logger.info(f"Chunks saved: {stats.saved_chunks}")
         logger.info(f"Chunks skipped: {stats.skipped_chunks} ({skip_reasons_str})")
+        logger.info(f"ASR calls saved by noise gate: {stats.gate_saved_asr_calls}")
+        logger.info(f"Dropped input frames: {audio_manager.dropped_frames} | "
+                    f"Abandoned at shutdown: {sum(stats.abandoned_items.values())}")
         logger.info(
             f"Average latency: {avg_latency:.2f}s (min: {min_latency:.2f}s, max: {max_latency:.2f}s, stddev: {stddev_latency:.2f}s)")
         logger.info(f"Avg chunk duration: {avg_duration:.2f}s")
+        rtf, depth = stats.recent_load(len(stats.real_time_factors))
+        logger.info(f"Real-time factor: {rtf:.2f} | Avg ASR queue depth: {depth:.1f} | "
+                    f"Final settings: {runtime_config.snapshot()}")
         logger.info(f"First transcription latency: {stats.first_latency_value:.2f}s")
+        if not STREAMING_MODE:
+            asr_per_hour, decoded_ratio = stats.asr_cost_summary()
+            decoded_tokens, duplicate_tokens, duplicate_rate = stats.seam_summary()
+            seams = "context prompt, no overlap" if session.context_prompt_mode else "overlap"
+            logger.info(f"ASR time: {asr_per_hour / 60:.1f} min per audio hour ({seams}, "
+                        f"{decoded_ratio:.2f}s decoded per new audio second) | "
+                        f"Seam duplicates removed: {duplicate_tokens}/{decoded_tokens} tokens ({duplicate_rate:.1%})")
+        if STREAMING_MODE:
+            avg_ttfw, avg_lag, p95_lag = stats.streaming_summary()
+            logger.info(f"Time to first word: {avg_ttfw:.2f}s avg over {len(stats.first_word_latencies)} utterances | "
+                        f"Commit lag: {avg_lag:.2f}s avg, {p95_lag:.2f}s p95")
         logger.info(f"Most detected language: {most_lang} ({most_lang_count})")
+        saved_str = (f"probe cost {probe_s:.3f}s over {probes_timed} probes, est. saved {saved_total:.1f}s"
+                     if probes_timed else "probe cost not measured")
+        logger.info(f"Language detection: {stats.probed_decodes} probed, "
+                    f"{stats.locked_decodes} locked or configured | {saved_str}")
+        for sink, (delivered, dropped, avg_lag, p95_lag, max_lag) in sorted(stats.sink_summary().items()):
+            logger.info(f"Sink {sink}: {delivered} delivered, {dropped} dropped | "
+                        f"lag {avg_lag * 1000:.1f}ms avg, {p95_lag * 1000:.1f}ms p95, {max_lag * 1000:.1f}ms max")
+        feature_ring = getattr(session, "feature_ring", None)
+        if feature_ring is not None:
+            featurized = feature_ring.frames_computed + feature_ring.frames_reused
+            logger.info(f"Log-mel frames: {feature_ring.frames_computed} computed, {feature_ring.frames_reused} reused "
+                        f"({feature_ring.frames_reused / featurized if featurized else 0.0:.0%})")
         logger.info("=============================")
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+# core/noise_floor.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config.config import (
+    RMS_PREFILTER_THRESHOLD, NOISE_GATE_MARGIN,
+    NOISE_FLOOR_FALL_RATE, NOISE_FLOOR_RISE_RATE, NOISE_FEEDBACK_DECAY
+)
+from core.utils import compute_rms
+
+
+class NoiseFloorEstimator:
+    """
+    Tracks the background noise level of the input and derives an RMS gate from it.
+
+    The floor follows quieter frames quickly (`fall_rate`) and rises only slowly
+    (`rise_rate`, relative per frame) through louder ones, so speech bursts barely
+    move it while a fan that starts up is picked up within seconds. Chunks whose
+    RMS is below `floor * margin` are treated as background noise.
+
+    Chunks the ASR model reports as non-speech are fed back with
+    `feedback_non_speech`, which raises a separate learned gate towards that
+    chunk's level. The learned gate decays slowly (`feedback_decay`, relative per
+    frame) rather than following quiet frames, so noise that made the model
+    hallucinate stays gated for minutes instead of until the next chunk.
+    """
+    def __init__(
+        self,
+        margin: float = NOISE_GATE_MARGIN,
+        fall_rate: float = NOISE_FLOOR_FALL_RATE,
+        rise_rate: float = NOISE_FLOOR_RISE_RATE,
+        min_threshold: float = RMS_PREFILTER_THRESHOLD,
+        feedback_decay: float = NOISE_FEEDBACK_DECAY,
+        max_pending: int = 64
+    ):
+        self.margin = margin
+        self.fall_rate = fall_rate
+        self.rise_rate = rise_rate
+        self.min_threshold = min_threshold
+        self.feedback_decay = feedback_decay
+        self.max_pending = max_pending
+        self.floor = None
+        self.learned_gate = 0.0  # RMS gate learned from non-speech feedback
+        self._pending = OrderedDict()  # chunk_index -> RMS of chunks sent to ASR
+        self._lock = threading.Lock()
+
+    def update(self, frame_int16: np.ndarray):
+        rms = compute_rms(frame_int16)
+        with self._lock:
+            if self.floor is None:
+                self.floor = rms
+            elif rms < self.floor:
+                self.floor += self.fall_rate * (rms - self.floor)
+            else:
+                self.floor = min(rms, self.floor * (1.0 + self.rise_rate))
+            self.learned_gate *= 1.0 - self.feedback_decay
+
+    def threshold(self) -> float:
+        with self._lock:
+            if self.floor is None:
+                return max(self.min_threshold, self.learned_gate)
+            return max(self.min_threshold, self.floor * self.margin, self.learned_gate)
+
+    def register_chunk(self, chunk_index: int, rms: float):
+        """
+        Remembers the RMS of a chunk passed on to ASR, for later feedback.
+        """
+        with self._lock:
+            self._pending[chunk_index] = rms
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+
+    def feedback_non_speech(self, chunk_index: int):
+        """
+        Raises the learned gate halfway from the current gate towards the
+        reported chunk's RMS; repeated reports at that level converge on it.
+        """
+        with self._lock:
+            rms = self._pending.pop(chunk_index, None)
+            if rms is None or self.floor is None:
+                return
+            gate = max(self.floor * self.margin, self.learned_gate)
+            if rms > gate:
+                self.learned_gate = gate + 0.5 * (rms - gate)
+
+    def feedback_speech(self, chunk_index: int):
+        with self._lock:
+            self._pending.pop(chunk_index, None)
@@ -0,0 +1,184 @@
+# core/pipeline.py
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+from config.config import STAGE_QUEUE_SIZE
+
+# End-of-stream marker. Each stage drains its inbox up to it, flushes, and forwards it.
+STOP = object()
+
+
+class Stage:
+    """
+    A pipeline stage running on its own thread.
+
+    The thread blocks on its bounded inbox, so it only wakes up when there is
+    work. Each item is passed to `handler`, which returns an iterable of items
+    for the next stage (or None). Outputs are put on the downstream inbox with a
+    blocking put, which applies back-pressure to slow stages.
+
+    When STOP arrives, `on_drain` is called to flush buffered state and STOP is
+    forwarded. If the pipeline aborts, remaining items are counted as abandoned
+    instead of processed.
+    """
+    def __init__(
+        self,
+        name: str,
+        handler: Callable,
+        on_drain: Optional[Callable] = None,
+        inbox: Optional[queue.Queue] = None,
+        maxsize: int = STAGE_QUEUE_SIZE,
+        logger=None
+    ):
+        self.name = name
+        self.handler = handler
+        self.on_drain = on_drain
+        self.inbox = inbox if inbox is not None else queue.Queue(maxsize=maxsize)
+        self.logger = logger
+        self.downstream: Optional["Stage"] = None
+        self.abort_event = threading.Event()
+        self.abandoned = 0
+        self.processed = 0
+        self.in_flight = False  # A handler call is in progress
+        self.thread = threading.Thread(target=self._run, daemon=True, name=name)
+
+    def unfinished(self) -> int:
+        """
+        Returns:
+            int: Items queued in the inbox (STOP excluded) plus the one being handled
+        """
+        with self.inbox.mutex:
+            queued = sum(1 for item in self.inbox.queue if item is not STOP)
+        return queued + int(self.in_flight)
+
+    def _emit(self, outputs: Optional[Iterable]):
+        if outputs is None or self.downstream is None:
+            return
+        for item in outputs:
+            while True:
+                try:
+                    # Only loops while the downstream inbox is full
+                    self.downstream.inbox.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    if self.abort_event.is_set():
+                        self.abandoned += 1
+                        break
+
+    def _run(self):
+        while True:
+            item = self.inbox.get()
+            if item is STOP:
+                break
+            if self.abort_event.is_set():
+                self.abandoned += 1
+                continue
+            self.in_flight = True
+            try:
+                self._emit(self.handler(item))
+                self.processed += 1
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"{self.name} stage error: {e}", exc_info=True)
+            finally:
+                self.in_flight = False
+
+        if self.on_drain is not None and not self.abort_event.is_set():
+            try:
+                self._emit(self.on_drain())
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"{self.name} stage failed to drain: {e}", exc_info=True)
+
+        if self.downstream is not None:
+            self.downstream.inbox.put(STOP)
+        if self.logger:
+            self.logger.info(f"{self.name} stage finished ({self.processed} processed, {self.abandoned} abandoned).")
+
+
+class Pipeline:
+    """
+    A chain of stages connected by bounded queues.
+
+    `shutdown` sends STOP into the first stage and waits for every stage to
+    drain its in-flight items. Work still queued when the deadline passes is
+    abandoned and reported, both in the log and in `SessionStats.abandoned_items`.
+    The deadline also bounds sending STOP, which waits if the first inbox is full.
+    """
+    def __init__(self, stats=None, logger=None):
+        self.stages: List[Stage] = []
+        self.stats = stats
+        self.logger = logger
+
+    def add_stage(self, name: str, handler: Callable, on_drain: Optional[Callable] = None,
+                  inbox: Optional[queue.Queue] = None, maxsize: int = STAGE_QUEUE_SIZE) -> Stage:
+        stage = Stage(name, handler, on_drain=on_drain, inbox=inbox, maxsize=maxsize, logger=self.logger)
+        if self.stages:
+            self.stages[-1].downstream = stage
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        for stage in self.stages:
+            stage.thread.start()
+        if self.logger:
+            self.logger.info(f"Pipeline started: {' -> '.join(s.name for s in self.stages)}")
+
+    def queue_depths(self) -> dict:
+        return {stage.name: stage.inbox.qsize() for stage in self.stages}
+
+    def shutdown(self, deadline_s: float) -> int:
+        """
+        Drains the pipeline for up to `deadline_s` seconds.
+
+        Returns:
+            int: Number of items abandoned across all stages
+        """
+        if not self.stages:
+            return 0
+        if self.logger:
+            pending = ", ".join(f"{name}: {depth}" for name, depth in self.queue_depths().items())
+            self.logger.info(f"Draining pipeline (deadline {deadline_s:.1f}s) | queued: {pending}")
+
+        end_time = time.monotonic() + deadline_s
+        first = self.stages[0]
+        try:
+            first.inbox.put(STOP, timeout=deadline_s)
+        except queue.Full:
+            if self.logger:
+                self.logger.warning(f"Drain deadline passed with the {first.name} inbox still full.")
+            self._abort()
+            try:
+                # Aborting stages discard their inbox, so there is room for STOP shortly
+                first.inbox.put(STOP, timeout=1.0)
+            except queue.Full:
+                pass
+        for stage in self.stages:
+            stage.thread.join(timeout=max(0.0, end_time - time.monotonic()))
+
+        stuck = [stage for stage in self.stages if stage.thread.is_alive()]
+        if stuck:
+            if self.logger:
+                self.logger.warning(f"Drain deadline passed; abandoning remaining work in: "
+                                    f"{', '.join(s.name for s in stuck)}")
+            self._abort()
+            for stage in stuck:
+                stage.thread.join(timeout=1.0)
+
+        total = 0
+        for stage in self.stages:
+            # Items still queued at, or being handled by, a stage that never finished are lost too
+            lost = stage.abandoned + (stage.unfinished() if stage.thread.is_alive() else 0)
+            if lost:
+                total += lost
+                if self.logger:
+                    self.logger.warning(f"{stage.name} stage abandoned {lost} item(s) at shutdown.")
+                if self.stats is not None:
+                    self.stats.add_abandoned(stage.name, lost)
+        return total
+
+    def _abort(self):
+        for stage in self.stages:
+            stage.abort_event.set()
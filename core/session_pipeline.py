@@ -0,0 +1,76 @@
+# core/session_pipeline.py
+from audio.chunk_processor import ChunkAssembler, SpeechFilter, create_noise_floor
+from config.config import AUTO_TUNE, CONTEXT_PROMPT_MODE
+from config.runtime import runtime_config
+from core.auto_tuner import LatencyAutoTuner
+from core.pipeline import Pipeline
+from core.sinks import create_event_bus
+from core.streaming import StreamingTranscriber
+from core.transcriber import (
+    transcribe_chunk, postprocess_transcript, write_paragraph, publish_partial, flush_paragraph
+)
+
+
+def build_pipeline(sample_rate, audio_manager, session, stats, logger) -> Pipeline:
+    """
+    Wires the processing stages: chunking -> VAD -> ASR -> post-processing -> writing.
+    Audio capture feeds the first stage through `audio_manager.frame_queue`; the
+    writing stage publishes transcript events to the sinks on `session.event_bus`,
+    which the caller closes with `close_event_bus` after `shutdown`.
+    """
+    create_event_bus(session, stats, logger)
+    context_prompt = getattr(session, "context_prompt_mode", CONTEXT_PROMPT_MODE)
+    if context_prompt:
+        # The preceding text carries context across chunk boundaries instead of overlapping audio
+        runtime_config.update(overlap_duration=0.0)
+    noise_floor = create_noise_floor(session)
+    assembler = ChunkAssembler(sample_rate, logger, noise_floor=noise_floor,
+                               dropped_before=getattr(audio_manager, "dropped_before", None))
+    speech_filter = SpeechFilter(sample_rate, stats, session, logger, noise_floor=noise_floor)
+    tuner = LatencyAutoTuner(stats, context_prompt=context_prompt, logger=logger) if AUTO_TUNE else None
+
+    def asr(chunk):
+        transcript = transcribe_chunk(chunk.filepath, chunk.chunk_id_str, chunk.chunk_index, session, stats, logger,
+                                      samples=chunk.samples, start_s=chunk.start_s,
+                                      stream_sample=chunk.stream_sample)
+        stats.record_queue_depth(asr_stage.inbox.qsize())
+        if tuner is not None:
+            tuner.observe()
+        return [(chunk, transcript)]
+
+    def postprocess(item):
+        chunk, transcript = item
+        update = postprocess_transcript(transcript, chunk.start_s, chunk.chunk_id_str, session, stats)
+        return [update] if update is not None else []
+
+    def write(update):
+        write_paragraph(update, session, logger)
+
+    pipeline = Pipeline(stats=stats, logger=logger)
+    pipeline.add_stage("Chunker", assembler.push, on_drain=assembler.flush, inbox=audio_manager.frame_queue)
+    pipeline.add_stage("VAD", speech_filter.process)
+    asr_stage = pipeline.add_stage("ASR", asr)
+    pipeline.add_stage("PostProcess", postprocess)
+    pipeline.add_stage("Writer", write, on_drain=lambda: flush_paragraph(session, logger))
+    return pipeline
+
+
+def build_streaming_pipeline(sample_rate, audio_manager, session, stats, logger) -> Pipeline:
+    """
+    Wires the streaming stages: streaming ASR (partial/committed) -> writing.
+    """
+    create_event_bus(session, stats, logger)
+    streamer = StreamingTranscriber(sample_rate, session, stats, logger, noise_floor=create_noise_floor(session),
+                                    dropped_before=getattr(audio_manager, "dropped_before", None))
+
+    def write(update):
+        if update["kind"] == "committed":
+            write_paragraph(update, session, logger)
+        else:
+            publish_partial(update, session)
+            logger.debug(f"{update['chunk_id']} | partial: {update['text'][:60]}")
+
+    pipeline = Pipeline(stats=stats, logger=logger)
+    pipeline.add_stage("Streamer", streamer.push, on_drain=streamer.flush, inbox=audio_manager.frame_queue)
+    pipeline.add_stage("Writer", write, on_drain=lambda: flush_paragraph(session, logger))
+    return pipeline
@@ -0,0 +1,84 @@
+# core/sinks.py
+import json
+import os
+from dataclasses import asdict
+
+from config.config import TRANSCRIPT_SINK_QUEUE_SIZE, EVENT_LOG_JSONL, SINK_DRAIN_TIMEOUT_S
+from core.events import EventBus, TranscriptEvent, PARAGRAPH_UPDATE, PARAGRAPH_FINAL
+
+EVENT_LOG_FILENAME = "events.jsonl"
+
+
+class TranscriptFileSink:
+    """
+    Writes final_transcript.txt: one "[start] paragraph" line per paragraph,
+    separated by blank lines once finalized.
+
+    The open paragraph is rewritten in place from its file offset on every
+    update. Each event carries the whole paragraph, so dropped updates are
+    harmless. If the final event of a paragraph was dropped, the paragraph is
+    finalized with its last known text when the next one starts.
+    """
+    def __init__(self, transcript_dir: str):
+        self.path = os.path.join(transcript_dir, "final_transcript.txt")
+        self.paragraph_offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self.open_event = None  # Latest event of the paragraph not yet finalized
+
+    def __call__(self, event: TranscriptEvent):
+        if self.open_event is not None and event.paragraph_id > self.open_event.paragraph_id:
+            self._write(self.open_event, final=True)
+        self._write(event, final=event.kind == PARAGRAPH_FINAL)
+
+    def _write(self, event: TranscriptEvent, final: bool):
+        terminator = "\n\n" if final else "\n"
+        line = f"[{event.start:.2f}] {event.text}{terminator}"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            f.seek(self.paragraph_offset)
+            f.write(line.encode("utf-8"))
+            f.truncate()
+            end_offset = f.tell()
+        if final:
+            self.paragraph_offset = end_offset
+            self.open_event = None
+        else:
+            self.open_event = event
+
+
+class JsonlEventSink:
+    """
+    Appends every event as one JSON line, for downstream consumers that tail the file.
+    """
+    def __init__(self, transcript_dir: str):
+        self.path = os.path.join(transcript_dir, EVENT_LOG_FILENAME)
+
+    def __call__(self, event: TranscriptEvent):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(event), ensure_ascii=False) + "\n")
+
+
+def create_event_bus(session, stats=None, logger=None) -> EventBus:
+    """
+    Creates the session's event bus with the transcript file sink (and the
+    JSONL event log if enabled). Other consumers subscribe to `session.event_bus`.
+    """
+    bus = EventBus(stats=stats, logger=logger)
+    bus.subscribe("transcript_file", TranscriptFileSink(session.transcript_dir),
+                  kinds=(PARAGRAPH_UPDATE, PARAGRAPH_FINAL), maxsize=TRANSCRIPT_SINK_QUEUE_SIZE)
+    if EVENT_LOG_JSONL:
+        bus.subscribe("event_log", JsonlEventSink(session.transcript_dir), maxsize=TRANSCRIPT_SINK_QUEUE_SIZE)
+    session.event_bus = bus
+    return bus
+
+
+def close_event_bus(session, deadline_s: float = SINK_DRAIN_TIMEOUT_S) -> int:
+    """
+    Session teardown: lets the sinks deliver what is queued, then stops them.
+    Called after the pipeline shut down, whether or not it drained, and also
+    closes a bus created on first use by send_to_asr.
+
+    Returns:
+        int: Number of events left undelivered (also counted in SessionStats.abandoned_items)
+    """
+    bus = getattr(session, "event_bus", None)
+    return bus.close(deadline_s) if bus is not None else 0
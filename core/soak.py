@@ -0,0 +1,262 @@
+# core/soak.py
+"""
+Soak test: drives the full pipeline with synthetic audio at accelerated speed
+and tracks memory per processed audio hour.
+
+Run from the project root, e.g. 24 audio hours as fast as possible with a
+synthetic ASR backend:
+    python -m core.soak --hours 24 --synthetic-asr
+
+Exits with status 1 if RSS grows faster than the memory budget.
+"""
+import argparse
+import ctypes
+import json
+import os
+import queue
+import sys
+import time
+import tracemalloc
+import types
+import wave
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from config.config import (
+    SAMPLE_RATE, FRAME_DURATION, FRAME_QUEUE_SIZE, SHUTDOWN_DRAIN_TIMEOUT_S,
+    SOAK_MEMORY_BUDGET_MB_PER_HOUR, SOAK_SAMPLE_INTERVAL_MIN
+)
+from config.session import SessionManager
+from config.session_stats import SessionStats
+from core.logger import setup_logger
+from core.session_pipeline import build_pipeline, build_streaming_pipeline
+from core.sinks import close_event_bus
+from core import transcriber
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_WORDS = ("the meeting will resume after a short break please check the pressure readings on line "
+          "two before we continue with the next item on the agenda").split()
+
+
+class SyntheticWhisperModel:
+    """
+    Stand-in for WhisperModel: featurizes the audio like the real model, then
+    returns filler text, spending `rtf` seconds per audio second.
+    """
+    def __init__(self, rtf: float = 0.0, seed: int = 0):
+        self.rtf = rtf
+        self.rng = np.random.default_rng(seed)
+        self.feature_extractor = FeatureExtractor()
+
+    def transcribe(self, audio, language=None, word_timestamps=False, **kwargs):
+        if isinstance(audio, str):
+            with wave.open(audio, "rb") as wf:
+                audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+        duration = len(audio) / SAMPLE_RATE
+        self.feature_extractor(audio)
+        if self.rtf:
+            time.sleep(duration * self.rtf)
+
+        n_words = max(1, int(duration * 2.5))
+        offset = int(self.rng.integers(len(_WORDS)))
+        words = [
+            types.SimpleNamespace(start=i * duration / n_words, end=(i + 0.8) * duration / n_words,
+                                  word=" " + _WORDS[(offset + i) % len(_WORDS)])
+            for i in range(n_words)
+        ]
+        segment = types.SimpleNamespace(
+            start=0.0, end=duration, text="".join(w.word for w in words),
+            avg_logprob=-0.3, no_speech_prob=0.05, words=words if word_timestamps else None
+        )
+        info = types.SimpleNamespace(language=language or "en", language_probability=0.99, duration=duration)
+        return iter([segment]), info
+
+
+def synthetic_frames(sample_rate: int, frame_samples: int, seed: int = 0):
+    """
+    Yields int16 frames alternating speech-like harmonic bursts and low-level noise pauses.
+    """
+    rng = np.random.default_rng(seed)
+    while True:
+        speech_s, pause_s = rng.uniform(2.0, 8.0), rng.uniform(0.5, 4.0)
+
+        t = np.arange(int(speech_s * sample_rate)) / sample_rate
+        pitch = rng.uniform(110, 240) * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllables = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t)) ** 2
+        speech = 0.15 * voiced * syllables + rng.normal(0, 0.005, len(t))
+        pause = rng.normal(0, 0.002, int(pause_s * sample_rate))
+
+        audio = (np.clip(np.concatenate([speech, pause]), -1, 1) * 32767).astype(np.int16)
+        for start in range(0, len(audio) - frame_samples + 1, frame_samples):
+            yield audio[start:start + frame_samples].reshape(-1, 1)
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource  # Peak RSS only: an upper bound where /proc is unavailable
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _release_freed_memory():
+    """
+    Returns freed heap pages to the OS (glibc only). Snapshots allocate one object
+    per live allocation; without this their freed pages stay in RSS and look like growth.
+    """
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def _module_label(filename: str) -> str:
+    if filename.startswith(PROJECT_ROOT):
+        return os.path.relpath(filename, PROJECT_ROOT)
+    parts = filename.replace("\\", "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            return parts[parts.index(marker) + 1]
+    return os.path.basename(filename)
+
+
+def top_allocators(limit: int = 10) -> list:
+    """
+    Returns:
+        list: (module, KiB) pairs for the modules holding the most traced memory
+    """
+    by_module = {}
+    for stat in tracemalloc.take_snapshot().statistics("filename"):
+        label = _module_label(stat.traceback[0].filename)
+        by_module[label] = by_module.get(label, 0) + stat.size
+    ranked = sorted(by_module.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+    return [(label, round(size / 1024.0, 1)) for label, size in ranked]
+
+
+def growth_per_hour(samples: list) -> float:
+    """
+    Least-squares slope of RSS (MB) over processed audio hours in the second half of
+    the run, so allocator warm-up and capped structures still filling are not counted.
+    """
+    points = [(s["audio_hours"], s["rss_mb"]) for s in samples[len(samples) // 2:]]
+    if len(points) < 2:
+        return 0.0
+    xs, ys = np.array(points).T
+    if np.ptp(xs) == 0:
+        return 0.0
+    return float(np.polyfit(xs, ys, 1)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24.0, help="Audio hours to process")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Playback speed relative to real time (0 = as fast as the pipeline allows)")
+    parser.add_argument("--synthetic-asr", action="store_true", help="Use a synthetic model instead of Whisper")
+    parser.add_argument("--asr-rtf", type=float, default=0.0, help="Real-time factor of the synthetic model")
+    parser.add_argument("--streaming", action="store_true", help="Soak the streaming pipeline")
+    parser.add_argument("--sample-every-min", type=float, default=SOAK_SAMPLE_INTERVAL_MIN,
+                        help="Processed audio minutes between memory samples")
+    parser.add_argument("--budget-mb-per-hour", type=float, default=SOAK_MEMORY_BUDGET_MB_PER_HOUR)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Only record RSS")
+    parser.add_argument("--keep-audio", action="store_true", help="Keep chunk WAV files")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    session = SessionManager(prefix="soak")
+    session.keep_audio_chunks = args.keep_audio
+    logger = setup_logger(session.session_id, session.log_dir)
+    stats = SessionStats()
+    report_path = os.path.join(session.log_dir, "soak_report.json")
+
+    if args.synthetic_asr:
+        transcriber.set_model(SyntheticWhisperModel(rtf=args.asr_rtf, seed=args.seed))
+    else:
+        logger.info("Loading ASR model...")
+        transcriber.load_model()
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+
+    audio_source = types.SimpleNamespace(frame_queue=queue.Queue(maxsize=FRAME_QUEUE_SIZE))
+    build = build_streaming_pipeline if args.streaming else build_pipeline
+    pipeline = build(SAMPLE_RATE, audio_source, session, stats, logger)
+    pipeline.start()
+
+    frame_samples = int(FRAME_DURATION * SAMPLE_RATE)
+    total_frames = int(args.hours * 3600 / FRAME_DURATION)
+    frames_per_sample = max(1, int(args.sample_every_min * 60 / FRAME_DURATION))
+    samples = []
+    start_wall = time.monotonic()
+
+    def record_sample(frames_fed: int):
+        sample = {
+            "audio_hours": frames_fed * FRAME_DURATION / 3600.0,
+            "wall_s": round(time.monotonic() - start_wall, 1),
+            "rss_mb": round(current_rss_mb(), 1),
+        }
+        if tracemalloc.is_tracing():
+            sample["traced_mb"] = round(tracemalloc.get_traced_memory()[0] / (1024.0 * 1024.0), 1)
+            sample["top_allocators_kib"] = top_allocators()
+            _release_freed_memory()
+            # Measured after the snapshot is freed; tracemalloc's own bookkeeping is not ours to budget
+            sample["rss_mb"] = round(current_rss_mb() - tracemalloc.get_tracemalloc_memory() / (1024.0 * 1024.0), 1)
+        samples.append(sample)
+        logger.info(f"Soak: {sample['audio_hours']:.2f} audio h in {sample['wall_s']:.0f}s | "
+                    f"RSS {sample['rss_mb']:.1f} MB | traced {sample.get('traced_mb', 0.0):.1f} MB")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "samples": samples}, f, indent=2)
+
+    logger.info(f"Soak test: {args.hours} audio hours at speed {args.speed or 'max'}, "
+                f"memory budget {args.budget_mb_per_hour} MB/h")
+    record_sample(0)
+    frames_fed = 0
+    try:
+        for frame in synthetic_frames(SAMPLE_RATE, frame_samples, seed=args.seed):
+            if frames_fed >= total_frames:
+                break
+            audio_source.frame_queue.put(frame)
+            frames_fed += 1
+            if args.speed > 0:
+                lead = frames_fed * FRAME_DURATION / args.speed - (time.monotonic() - start_wall)
+                if lead > 0:
+                    time.sleep(lead)
+            if frames_fed % frames_per_sample == 0:
+                record_sample(frames_fed)
+    except KeyboardInterrupt:
+        logger.info("Soak test interrupted.")
+
+    pipeline.shutdown(SHUTDOWN_DRAIN_TIMEOUT_S)
+    close_event_bus(session)
+    record_sample(frames_fed)
+
+    growth = growth_per_hour(samples)
+    passed = growth <= args.budget_mb_per_hour
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "samples": samples,
+                   "growth_mb_per_hour": growth, "passed": passed}, f, indent=2)
+
+    logger.info("===== SOAK SUMMARY =====")
+    logger.info(f"Processed {samples[-1]['audio_hours']:.2f} audio hours in {samples[-1]['wall_s']:.0f}s")
+    logger.info(f"Chunks saved: {stats.saved_chunks} | skipped: {stats.skipped_chunks}")
+    if not args.streaming:
+        asr_per_hour, decoded_ratio = stats.asr_cost_summary()
+        logger.info(f"ASR time: {asr_per_hour / 60:.1f} min per audio hour, {decoded_ratio:.2f}s decoded per new "
+                    f"audio second | seam duplicates removed: {stats.seam_summary()[1]} tokens")
+    for sink, (delivered, dropped, avg_lag, p95_lag, _) in sorted(stats.sink_summary().items()):
+        logger.info(f"Sink {sink}: {delivered} delivered, {dropped} dropped, lag p95 {p95_lag * 1000:.1f}ms")
+    logger.info(f"RSS growth: {growth:.2f} MB per audio hour (budget {args.budget_mb_per_hour:.2f}) -> "
+                f"{'PASS' if passed else 'FAIL'}")
+    logger.info(f"Report: {report_path}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
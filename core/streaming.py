@@ -0,0 +1,273 @@
+# core/streaming.py
+import bisect
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config.config import (
+    STREAM_STEP_S, STREAM_MAX_BUFFER_S, STREAM_PROMPT_CHARS, RMS_PREFILTER_THRESHOLD
+)
+from config.runtime import runtime_config
+from core.language_lock import LanguageLock
+from core.text_postprocessor import remove_repeated_words
+from core.features import create_feature_ring
+from core.transcriber import load_model, transcribe_audio
+from core.utils import compute_rms, is_chunk_speech
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def _normalize(word: str) -> str:
+    return _NORMALIZE_RE.sub("", word.lower())
+
+
+class StreamingTranscriber:
+    """
+    Streaming ASR stage using a committed-prefix (local agreement) policy.
+
+    Captured frames are appended to an audio buffer. Every `step_s` seconds of new
+    speech the whole buffer is re-decoded with word timestamps. Words on which the
+    last two decodes agree are committed; the rest of the hypothesis is emitted
+    as a partial. The buffer is trimmed at the end of the last committed word, and
+    the committed text is passed back as the prompt for the next decode.
+
+    A silent step ends the utterance and commits whatever is pending; a buffer
+    longer than `max_buffer_s` force-commits the current hypothesis, or is
+    trimmed to half that length if the decode has no words.
+
+    Frames dropped by the capture callback are reported through `dropped_before`
+    (see `AudioInputManager.dropped_before`). The buffer holds received audio
+    only: `buffer_start_sample` counts received samples and keys cached log-mel
+    frames, while word times, trims and `total_samples` map through the recorded
+    gaps onto the session clock.
+
+    Time-to-first-word and commit lag compare word times with the wall clock,
+    taking the arrival of the first frame as t=0. They are only valid for
+    real-time capture; replayed or accelerated input (e.g. the soak test)
+    makes them meaningless.
+
+    Emits update dicts with "kind" set to "partial" or "committed".
+    """
+    def __init__(self, sample_rate: int, session, stats, logger, noise_floor=None,
+                 step_s: float = STREAM_STEP_S, max_buffer_s: float = STREAM_MAX_BUFFER_S,
+                 dropped_before: Optional[Callable[[int], int]] = None):
+        self.sample_rate = sample_rate
+        self.session = session
+        self.stats = stats
+        self.logger = logger
+        self.noise_floor = noise_floor
+        self.step_samples = int(step_s * sample_rate)
+        self.max_buffer_samples = int(max_buffer_s * sample_rate)
+
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.incoming = []  # Frames not yet appended to audio
+        self.buffer_start_sample = 0  # Received-sample index of audio[0]
+        self.buffer_start_s = 0.0  # Global time of audio[0]
+        self.new_samples = 0
+        self.total_samples = 0  # Session clock in samples, dropped frames included
+        self.received_samples = 0
+        self.dropped_before = dropped_before
+        self.frames_received = 0
+        self.gap_at = []  # Received-sample index following each gap
+        self.gap_total = []  # Samples dropped up to and including each gap
+        self.origin_wall = None  # Wall-clock time of global t=0, assuming real-time capture
+        self.pending_words: List[Dict] = []  # Previous hypothesis beyond the committed prefix
+        self.committed_text = ""
+        self.in_utterance = False
+        self.utterance_onset_s = 0.0
+        self.first_word_emitted = False
+        self.update_num = 0
+
+        if not hasattr(session, "language_lock"):
+            session.language_lock = LanguageLock(fixed_language=getattr(session, "language", None), logger=logger)
+        if not hasattr(session, "feature_ring"):
+            session.feature_ring = create_feature_ring(load_model(), sample_rate)
+        # Trims keep the buffer start on a feature hop so cached log-mel frames stay reusable
+        self.trim_step = session.feature_ring.hop_length if session.feature_ring is not None else 1
+
+    def push(self, frame: np.ndarray) -> List[Dict]:
+        if self.dropped_before is not None:
+            gap = self.dropped_before(self.frames_received)
+            if gap:
+                self._add_gap(gap)
+        self.frames_received += 1
+
+        if self.origin_wall is None:
+            self.origin_wall = time.time() - (self.total_samples + frame.shape[0]) / self.sample_rate
+        if self.noise_floor is not None:
+            self.noise_floor.update(frame)
+
+        samples = frame.reshape(-1)
+        self.incoming.append(samples.astype(np.float32) / 32768.0)
+        self.new_samples += len(samples)
+        self.total_samples += len(samples)
+        self.received_samples += len(samples)
+
+        if self.new_samples < self.step_samples:
+            return []
+
+        self.audio = np.concatenate([self.audio] + self.incoming)
+        self.incoming = []
+        step_audio = (self.audio[-min(self.new_samples, len(self.audio)):] * 32768.0).astype(np.int16)
+        self.new_samples = 0
+
+        if not self._is_speech(step_audio):
+            updates = self._commit(self.pending_words, end_of_utterance=True)
+            self.pending_words = []
+            self.in_utterance = False
+            # Keep one step of lead-in so the next utterance's onset is not clipped
+            self._trim_to(max(self.buffer_end_s() - self.step_samples / self.sample_rate, self.buffer_start_s))
+            return updates
+
+        if not self.in_utterance:
+            self.in_utterance = True
+            self.first_word_emitted = False
+            self.utterance_onset_s = self.buffer_end_s() - len(step_audio) / self.sample_rate
+
+        return self._decode()
+
+    def flush(self) -> List[Dict]:
+        """
+        Commits the pending hypothesis at shutdown.
+        """
+        if self.incoming:
+            self.audio = np.concatenate([self.audio] + self.incoming)
+            self.incoming = []
+        updates = self._decode() if self.in_utterance and len(self.audio) else []
+        updates += self._commit(self.pending_words, end_of_utterance=True)
+        self.pending_words = []
+        return updates
+
+    def buffer_end_s(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    def _is_speech(self, step_int16: np.ndarray) -> bool:
+        gate = self.noise_floor.threshold() if self.noise_floor is not None else RMS_PREFILTER_THRESHOLD
+        if compute_rms(step_int16) < gate:
+            return False
+        return is_chunk_speech(step_int16, self.sample_rate, self.logger)
+
+    def _decode(self) -> List[Dict]:
+        language = self.session.language_lock.next_language()
+        prompt = self.committed_text[-STREAM_PROMPT_CHARS:] or None
+        ring = self.session.feature_ring
+        features = ring.window(self.buffer_start_sample, self.audio) if ring is not None else None
+        start_time = time.time()
+        transcript = transcribe_audio(self.audio, beam_size=runtime_config.beam_size, language=language,
+                                      initial_prompt=prompt, word_timestamps=True, features=features)
+        latency = time.time() - start_time
+        self.stats.add_latency(latency)
+        self.stats.add_real_time_factor(latency, transcript["duration"])
+        if language is None:
+            self.stats.add_detected_language(transcript["language"])
+        self.stats.add_language_decode(language is not None, transcript["language_probe_s"])
+
+        logprobs = [s["avg_logprob"] for s in transcript["segments"]]
+        self.session.language_lock.observe(
+            transcript["language"], transcript["language_probability"],
+            sum(logprobs) / len(logprobs) if logprobs else None, probed=language is None
+        )
+
+        words = [
+            {"start": self._session_s(w["start"]), "end": self._session_s(w["end"]), "word": w["word"]}
+            for s in transcript["segments"] for w in s.get("words", []) if _normalize(w["word"])
+        ]
+        self.logger.debug(f"Stream decode {len(self.audio) / self.sample_rate:.2f}s buffer in {latency:.2f}s: "
+                          f"{' '.join(w['word'] for w in words)[:80]}")
+
+        # Local agreement: commit the longest prefix shared with the previous hypothesis
+        agreed = 0
+        while (agreed < len(words) and agreed < len(self.pending_words)
+               and _normalize(words[agreed]["word"]) == _normalize(self.pending_words[agreed]["word"])):
+            agreed += 1
+
+        if agreed == 0 and len(self.audio) >= self.max_buffer_samples:
+            if words:
+                # No agreement within the buffer limit: commit all but the last word
+                agreed = max(1, len(words) - 1)
+            else:
+                # Speech-like audio with no words (e.g. music): keep the buffer bounded
+                self._trim_to(self.buffer_end_s() - self.max_buffer_samples / (2 * self.sample_rate))
+
+        updates = self._commit(words[:agreed])
+        self.pending_words = words[agreed:]
+
+        if self.pending_words:
+            self._note_first_word()
+            self.update_num += 1
+            updates.append({
+                "kind": "partial",
+                "chunk_id": f"stream_{self.update_num:05d}",
+                "text": " ".join(w["word"] for w in self.pending_words),
+                "start": self.pending_words[0]["start"],
+                "end": self.pending_words[-1]["end"],
+            })
+        return updates
+
+    def _commit(self, words: List[Dict], end_of_utterance: bool = False) -> List[Dict]:
+        if not words:
+            return []
+        now = time.time()
+        for w in words:
+            self.stats.add_commit_lag(now - (self.origin_wall + w["end"]))
+        self._note_first_word()
+
+        text = remove_repeated_words(" ".join(w["word"] for w in words))
+        self.committed_text = f"{self.committed_text} {text}".strip()[-STREAM_PROMPT_CHARS:]
+        if not end_of_utterance:
+            self._trim_to(words[-1]["end"])
+
+        self.update_num += 1
+        return [{
+            "kind": "committed",
+            "chunk_id": f"stream_{self.update_num:05d}",
+            "text": text,
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+        }]
+
+    def _note_first_word(self):
+        if self.in_utterance and not self.first_word_emitted:
+            self.first_word_emitted = True
+            self.stats.add_first_word_latency(time.time() - (self.origin_wall + self.utterance_onset_s))
+
+    def _add_gap(self, samples: int):
+        self.gap_at.append(self.received_samples)
+        self.gap_total.append((self.gap_total[-1] if self.gap_total else 0) + samples)
+        self.total_samples += samples
+
+    def _dropped_until(self, received_sample: float) -> int:
+        i = bisect.bisect_right(self.gap_at, received_sample)
+        return self.gap_total[i - 1] if i else 0
+
+    def _session_s(self, buffer_s: float) -> float:
+        # Decoder times are relative to audio[0] and do not include dropped frames
+        received = self.buffer_start_sample + buffer_s * self.sample_rate
+        return (received + self._dropped_until(received)) / self.sample_rate
+
+    def _received_sample(self, global_s: float) -> int:
+        session_sample = int(round(global_s * self.sample_rate))
+        dropped = 0
+        for at, total in zip(self.gap_at, self.gap_total):
+            if session_sample < at + dropped:
+                break
+            if session_sample < at + total:
+                return at  # Inside a gap: the first sample received after it
+            dropped = total
+        return session_sample - dropped
+
+    def _trim_to(self, global_s: float):
+        cut = self._received_sample(global_s) - self.buffer_start_sample
+        cut = max(0, min(cut, len(self.audio)))
+        cut -= (self.buffer_start_sample + cut) % self.trim_step
+        if cut > 0:
+            self.audio = self.audio[cut:]
+            self.buffer_start_sample += cut
+            self.buffer_start_s = self._session_s(0.0)
+            # Gaps behind the buffer are only needed for their running total
+            behind = bisect.bisect_right(self.gap_at, self.buffer_start_sample) - 1
+            if behind > 0:
+                del self.gap_at[:behind]
+                del self.gap_total[:behind]
@@ -41,6 +41,7 @@ class TranscriptBuffer:
         self.last_tail = (self.last_tail + new_tokens)[-self.window_size:]
         self.last_cleaned = new_line
         self.line_history.append(new_line)
+        del self.line_history[:-self.memory_lines]  # Only the last memory_lines are ever compared
         return new_line
 
 def trim_chunk_overlap(prev_tokens: list[str], new_text: str, min_match: int = 5) -> str:
@@ -1,9 +1,21 @@
 import time
 import os
-from typing import Dict, Optional
-from faster_whisper import WhisperModel
-from config.config import CHUNK_DURATION, OVERLAP_DURATION, SAVE_PER_CHUNK_JSON
+import re
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Union
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+from config.config import (
+    SAMPLE_RATE, SAVE_PER_CHUNK_JSON, NO_SPEECH_FEEDBACK_PROB, PARAGRAPH_MAX_CHARS,
+    CONTEXT_PROMPT_MODE, CONTEXT_PROMPT_CHARS
+)
+from config.runtime import runtime_config
 from core.utils import save_transcript
+from core.transcript_index import append_journal, INDEX_FILENAME
+from core.language_lock import LanguageLock
+from core.features import PrecomputedFeatureExtractor, create_feature_ring
+from core.events import TranscriptEvent, PARTIAL, PARAGRAPH_UPDATE, PARAGRAPH_FINAL
+from core.sinks import create_event_bus
 from core.text_postprocessor import (
     TranscriptBuffer,
     trim_chunk_overlap,
@@ -14,99 +26,357 @@ MODEL_SIZE = "medium"
 DEVICE = "cuda"
 COMPUTE_TYPE = "int8" if DEVICE == "cpu" else "float16"
 
-model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
+model = None  # Loaded by load_model(); set_model() swaps in another backend (e.g. for soak runs)
+
+
+def load_model():
+    global model
+    if model is None:
+        model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
+    return model
+
+
+def set_model(asr_model):
+    """
+    Replaces the ASR model with any object exposing faster-whisper's `transcribe`.
+    """
+    global model
+    model = asr_model
+
+
+def _feature_shim(asr_model) -> Optional[PrecomputedFeatureExtractor]:
+    extractor = getattr(asr_model, "feature_extractor", None)
+    if extractor is None:
+        return None
+    if not isinstance(extractor, PrecomputedFeatureExtractor):
+        extractor = asr_model.feature_extractor = PrecomputedFeatureExtractor(extractor)
+    return extractor
+
 
+def _probe_language(asr_model, audio: np.ndarray, features: Optional[np.ndarray]):
+    """
+    Runs language detection on its own, the same encoder pass transcribe() would
+    make, so that its cost can be measured.
 
-def transcribe_audio(audio_path: str, beam_size: int = 5, language: Optional[str] = None, logger=None) -> Dict:
+    Returns:
+        tuple: (language, probability, seconds spent), or None if the model cannot detect separately
+    """
+    if not hasattr(asr_model, "detect_language") or not getattr(getattr(asr_model, "model", None),
+                                                                "is_multilingual", False):
+        return None
+    start_time = time.time()
+    if features is not None:
+        language, probability, _ = asr_model.detect_language(features=features)
+    else:
+        language, probability, _ = asr_model.detect_language(audio=audio)
+    return language, probability, time.time() - start_time
+
+
+def transcribe_audio(audio_path: Union[str, np.ndarray], beam_size: int = 5, language: Optional[str] = None,
+                     logger=None, initial_prompt: Optional[str] = None, word_timestamps: bool = False,
+                     features: Optional[np.ndarray] = None, source: Optional[str] = None) -> Dict:
+    """
+    Transcribes a WAV file, or a float32 16 kHz buffer when given an array.
+    With `word_timestamps`, each segment also carries its words with start/end times.
+    `features` are precomputed log-mel features of the buffer, used instead of featurizing it again.
+    `source` labels the audio in log lines.
+
+    Without a `language`, detection runs first as a separate, timed step;
+    "language_probe_s" holds its duration (None if no language was detected).
+    """
+    if source is None:
+        source = audio_path if isinstance(audio_path, str) else f"<buffer {len(audio_path)} samples>"
     if logger:
-        logger.info(f"Transcribing: {audio_path} | beam_size={beam_size} | lang={language or 'auto'}")
-    segments, info = model.transcribe(audio_path, beam_size=beam_size, language=language)
+        logger.info(f"Transcribing: {source} | beam_size={beam_size} | lang={language or 'auto'}")
+    asr_model = load_model()
+
+    probe = None
+    if language is None and hasattr(asr_model, "detect_language"):
+        if isinstance(audio_path, str):
+            audio_path = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        probe = _probe_language(asr_model, audio_path, features)
+        if probe is not None:
+            language = probe[0]
+
+    shim = _feature_shim(asr_model) if features is not None and isinstance(audio_path, np.ndarray) else None
+    with shim.provide(audio_path, features) if shim is not None else nullcontext():
+        segments, info = asr_model.transcribe(audio_path, beam_size=beam_size, language=language,
+                                              initial_prompt=initial_prompt, word_timestamps=word_timestamps)
     results = {
         "language": info.language,
+        "language_probability": probe[1] if probe is not None else info.language_probability,
+        "language_probe_s": probe[2] if probe is not None else None,
         "duration": info.duration,
-        "segments": [{"start": s.start, "end": s.end, "text": s.text.strip()} for s in segments]
+        "segments": []
     }
+    for s in segments:
+        segment = {"start": s.start, "end": s.end, "text": s.text.strip(),
+                   "avg_logprob": s.avg_logprob, "no_speech_prob": s.no_speech_prob}
+        if word_timestamps:
+            segment["words"] = [{"start": w.start, "end": w.end, "word": w.word.strip()} for w in s.words or []]
+        results["segments"].append(segment)
     if logger:
-        logger.info(f"Transcription complete: {audio_path} | Language: {info.language} | Duration: {info.duration:.2f}s")
+        logger.info(f"Transcription complete: {source} | Language: {info.language} | Duration: {info.duration:.2f}s")
     return results
 
 
-def send_to_asr(audio_filepath: str, chunk_id_str: str, chunk_index: int, session, stats, logger=None):
-    try:
-        start_time = time.time()
-        transcript = transcribe_audio(audio_filepath, beam_size=5, language=None, logger=logger)
-        latency = time.time() - start_time
-        stats.add_latency(latency)
+def transcribe_chunk(audio_filepath: str, chunk_id_str: str, chunk_index: int, session, stats,
+                     logger=None, samples: Optional[np.ndarray] = None, start_s: float = 0.0,
+                     stream_sample: Optional[int] = None) -> Optional[Dict]:
+    """
+    ASR stage: transcribes one speech chunk and records its stats.
+
+    When the chunk's int16 `samples` and global start time are given, the audio is
+    decoded from memory and log-mel frames shared with neighbouring chunks are reused.
+    Frames are keyed by `stream_sample` (see `AudioChunk`) when given, else by the start time.
+
+    In context prompt mode the text decoded from the preceding chunks is passed
+    as the prompt. It is kept here rather than taken from `token_history`, which
+    the post-processing stage may not have updated yet for the previous chunk.
+    """
+    if not hasattr(session, "language_lock"):
+        session.language_lock = LanguageLock(fixed_language=getattr(session, "language", None), logger=logger)
+    if not hasattr(session, "feature_ring"):
+        session.feature_ring = create_feature_ring(load_model(), SAMPLE_RATE)
+    if not hasattr(session, "decoded_until_s"):
+        session.decoded_until_s = 0.0
+    context_prompt = getattr(session, "context_prompt_mode", CONTEXT_PROMPT_MODE)
+    if context_prompt and not hasattr(session, "prompt_context"):
+        session.prompt_context = ""
+
+    audio, features = audio_filepath, None
+    if samples is not None and session.feature_ring is not None:
+        audio = samples.reshape(-1).astype(np.float32) / 32768.0
+        offset = stream_sample if stream_sample is not None else int(round(start_s * SAMPLE_RATE))
+        features = session.feature_ring.window(offset, audio)
+
+    language = session.language_lock.next_language()
+    prompt = (session.prompt_context[-CONTEXT_PROMPT_CHARS:] or None) if context_prompt else None
+    start_time = time.time()
+    transcript = transcribe_audio(audio, beam_size=runtime_config.beam_size, language=language, logger=logger,
+                                  initial_prompt=prompt, features=features, source=audio_filepath)
+    latency = time.time() - start_time
+    stats.add_latency(latency)
+    stats.add_real_time_factor(latency, transcript["duration"])
+    stats.add_chunk_duration(transcript["duration"])
+    if language is None:
         stats.add_detected_language(transcript["language"])
-        stats.add_chunk_duration(transcript["duration"])
-
-        if SAVE_PER_CHUNK_JSON:
-            raw_path = os.path.join(session.transcript_dir, f"{chunk_id_str}.json")
-            save_transcript(transcript, raw_path, logger=logger)
-
-        segments = transcript["segments"]
-        if not segments:
-            return
-
-        # Merge segment texts
-        merged_text = ". ".join(s["text"] for s in segments).strip()
-
-        # Global time offset
-        step_duration = CHUNK_DURATION - OVERLAP_DURATION
-        chunk_offset = (chunk_index - 1) * step_duration
-        global_start = chunk_offset + segments[0]["start"]
-
-        # Init once
-        if not hasattr(session, "dedup_buffer"):
-            session.dedup_buffer = TranscriptBuffer()
-        if not hasattr(session, "token_history"):
-            session.token_history = []
-        if not hasattr(session, "paragraph_buffer"):
-            session.paragraph_buffer = []
-        if not hasattr(session, "paragraph_start_time"):
-            session.paragraph_start_time = global_start
+    stats.add_language_decode(language is not None, transcript["language_probe_s"])
 
-        # Deduplicate & clean
-        cleaned = session.dedup_buffer.deduplicate(merged_text)
-        if not cleaned:
-            return
+    # Audio past the end of the previous chunk is new; the rest was decoded before as overlap
+    chunk_end_s = start_s + transcript["duration"]
+    stats.add_asr_cost(latency, transcript["duration"], max(0.0, chunk_end_s - max(start_s, session.decoded_until_s)))
+    session.decoded_until_s = max(session.decoded_until_s, chunk_end_s)
 
-        cleaned = trim_chunk_overlap(session.token_history[-20:], cleaned)
-        cleaned = remove_repeated_words(cleaned)
-
-        # Update token history
-        session.token_history += cleaned.split()
-        session.token_history = session.token_history[-100:]
-
-        # Track start time for paragraph
-        if not session.paragraph_buffer:
-            session.paragraph_start_time = global_start
-
-        # Append to paragraph buffer
-        session.paragraph_buffer.append(cleaned)
-
-        # Build current paragraph
-        paragraph = " ".join(session.paragraph_buffer).strip()
-        timestamp = session.paragraph_start_time
-        final_path = os.path.join(session.transcript_dir, "final_transcript.txt")
-
-        # Overwrite last paragraph line in file
-        if os.path.exists(final_path):
-            with open(final_path, "r+", encoding="utf-8") as f:
-                lines = f.readlines()
-                if lines:
-                    lines[-1] = f"[{timestamp:.2f}] {paragraph}\n"
-                    f.seek(0)
-                    f.writelines(lines)
-                    f.truncate()
-                else:
-                    f.write(f"[{timestamp:.2f}] {paragraph}\n")
+    if context_prompt:
+        decoded = " ".join(s["text"] for s in transcript["segments"] if s["no_speech_prob"] < NO_SPEECH_FEEDBACK_PROB)
+        if decoded:
+            context = remove_repeated_words(f"{session.prompt_context} {decoded}")
+            session.prompt_context = context[-CONTEXT_PROMPT_CHARS:]
+
+    logprobs = [s["avg_logprob"] for s in transcript["segments"]]
+    session.language_lock.observe(
+        transcript["language"],
+        transcript["language_probability"],
+        sum(logprobs) / len(logprobs) if logprobs else None,
+        probed=language is None
+    )
+
+    if SAVE_PER_CHUNK_JSON:
+        raw_path = os.path.join(session.transcript_dir, f"{chunk_id_str}.json")
+        save_transcript(transcript, raw_path, logger=logger)
+
+    if not getattr(session, "keep_audio_chunks", True):
+        try:
+            os.remove(audio_filepath)
+        except OSError as e:
+            if logger:
+                logger.warning(f"Could not remove transcribed chunk {audio_filepath}: {e}")
+
+    # Let the noise gate learn from chunks the model heard no speech in
+    noise_floor = getattr(session, "noise_floor", None)
+    if noise_floor is not None:
+        if all(s["no_speech_prob"] >= NO_SPEECH_FEEDBACK_PROB for s in transcript["segments"]):
+            noise_floor.feedback_non_speech(chunk_index)
         else:
-            with open(final_path, "w", encoding="utf-8") as f:
-                f.write(f"[{timestamp:.2f}] {paragraph}\n")
+            noise_floor.feedback_speech(chunk_index)
+
+    return transcript
+
+
+def _token_start_times(segments, chunk_offset: float) -> List[float]:
+    # Global start time of each whitespace token, interpolated by character position within its segment
+    times = []
+    for s in segments:
+        text_len = max(len(s["text"]), 1)
+        for m in re.finditer(r"\S+", s["text"]):
+            times.append(chunk_offset + s["start"] + (s["end"] - s["start"]) * m.start() / text_len)
+    return times
+
+
+def postprocess_transcript(transcript: Dict, chunk_offset: float, chunk_id_str: str, session,
+                           stats=None) -> Optional[Dict]:
+    """
+    Post-processing stage: merges segments, removes overlap duplicates and repeats.
+
+    Args:
+        transcript (dict): Output of transcribe_chunk
+        chunk_offset (float): Global session time of the chunk start, in seconds
+        stats (SessionStats): Receives the number of tokens removed as duplicates at the seam
 
+    Returns:
+        dict: Cleaned text with its global start/end time, or None if nothing is left.
+            Deduplication only removes leading words, so the start is that of the first word kept.
+    """
+    segments = transcript["segments"]
+    if not segments:
+        return None
+
+    # Merge segment texts
+    merged_text = ". ".join(s["text"] for s in segments).strip()
+
+    global_start = chunk_offset + segments[0]["start"]
+    global_end = chunk_offset + segments[-1]["end"]
+
+    # Init once
+    if not hasattr(session, "dedup_buffer"):
+        session.dedup_buffer = TranscriptBuffer()
+    if not hasattr(session, "token_history"):
+        session.token_history = []
+
+    # Deduplicate & clean
+    decoded_tokens = len(merged_text.split())
+    cleaned = session.dedup_buffer.deduplicate(merged_text)
+    if cleaned:
+        cleaned = trim_chunk_overlap(session.token_history[-20:], cleaned)
+    removed = decoded_tokens - len(cleaned.split())
+    if stats is not None:
+        stats.add_seam_tokens(decoded_tokens, removed)
+    if not cleaned:
+        return None
+
+    if removed:
+        token_times = _token_start_times(segments, chunk_offset)
+        if token_times:
+            global_start = token_times[min(removed, len(token_times) - 1)]
+
+    cleaned = remove_repeated_words(cleaned)
+
+    # Update token history
+    session.token_history += cleaned.split()
+    session.token_history = session.token_history[-100:]
+
+    return {"chunk_id": chunk_id_str, "text": cleaned, "start": global_start, "end": global_end}
+
+
+def _event_bus(session):
+    # Pipelines create the bus up front; the synchronous send_to_asr path gets one on first use
+    if not hasattr(session, "event_bus"):
+        create_event_bus(session)
+    return session.event_bus
+
+
+def _publish_paragraph(session, kind: str, delta: str):
+    last_update = session.paragraph_last_update
+    _event_bus(session).publish(TranscriptEvent(
+        kind=kind,
+        session_id=session.session_id,
+        paragraph_id=session.paragraph_id,
+        text=" ".join(session.paragraph_buffer).strip(),
+        delta=delta,
+        start=session.paragraph_start_time,
+        end=last_update["end"],
+        chunk_id=last_update["chunk_id"],
+    ))
+
+
+def write_paragraph(update: Dict, session, logger=None):
+    """
+    Writing stage: journals the cleaned text for search, extends the current paragraph and
+    publishes it on the session's event bus. Paragraphs longer than
+    PARAGRAPH_MAX_CHARS are finalized and a new one begins.
+    """
+    # Init once
+    if not hasattr(session, "paragraph_buffer"):
+        session.paragraph_buffer = []
+    if not hasattr(session, "paragraph_id"):
+        session.paragraph_id = 0
+    if not hasattr(session, "paragraph_start_time"):
+        session.paragraph_start_time = update["start"]
+
+    # Track start time for paragraph
+    if not session.paragraph_buffer:
+        session.paragraph_start_time = update["start"]
+
+    # Journal the text with its global audio offsets; TranscriptIndex.load indexes it for queries
+    append_journal(os.path.join(session.transcript_dir, INDEX_FILENAME), update["chunk_id"], update["text"],
+                   update["start"], update["end"])
+
+    # Append to paragraph buffer
+    session.paragraph_buffer.append(update["text"])
+    session.paragraph_last_update = update
+    paragraph_chars = sum(len(t) + 1 for t in session.paragraph_buffer)
+
+    if paragraph_chars > PARAGRAPH_MAX_CHARS:
+        _publish_paragraph(session, PARAGRAPH_FINAL, update["text"])
         if logger:
-            logger.info(f"{chunk_id_str} | updated paragraph: {paragraph[:60]}...")
+            logger.info(f"{update['chunk_id']} | finalized paragraph ({paragraph_chars} chars)")
+        session.paragraph_buffer = []
+        session.paragraph_id += 1
+        return
+
+    _publish_paragraph(session, PARAGRAPH_UPDATE, update["text"])
+    if logger:
+        logger.info(f"{update['chunk_id']} | updated paragraph: {' '.join(session.paragraph_buffer)[:60]}...")
+
+
+def publish_partial(update: Dict, session):
+    """
+    Publishes a streaming hypothesis that follows the open paragraph.
+    """
+    _event_bus(session).publish(TranscriptEvent(
+        kind=PARTIAL,
+        session_id=session.session_id,
+        paragraph_id=getattr(session, "paragraph_id", 0),
+        text=update["text"],
+        delta=update["text"],
+        start=update["start"],
+        end=update["end"],
+        chunk_id=update["chunk_id"],
+    ))
+
+
+def flush_paragraph(session, logger=None):
+    """
+    Final paragraph flush at shutdown.
+    """
+    if hasattr(session, "paragraph_buffer") and session.paragraph_buffer:
+        try:
+            _publish_paragraph(session, PARAGRAPH_FINAL, "")
+            session.paragraph_buffer = []
+            session.paragraph_id += 1
+            if logger:
+                logger.info("Final paragraph flushed at shutdown.")
+        except Exception as e:
+            if logger:
+                logger.error(f"Failed to flush final paragraph: {e}", exc_info=True)
+
+
+def send_to_asr(audio_filepath: str, chunk_id_str: str, chunk_index: int, session, stats, logger=None,
+                *, start_s: float):
+    """
+    Runs the ASR, post-processing and writing stages for one chunk synchronously.
+    The session's event bus is created on first use; close it with `close_event_bus` when the session ends.
+
+    `start_s` is the chunk's global start time (`AudioChunk.start_s`). It can't be derived from
+    `chunk_index`, since the tuner may change the step length during a session.
+    """
+    try:
+        transcript = transcribe_chunk(audio_filepath, chunk_id_str, chunk_index, session, stats, logger,
+                                      start_s=start_s)
+        update = postprocess_transcript(transcript, start_s, chunk_id_str, session, stats)
+        if update is not None:
+            write_paragraph(update, session, logger)
 
     except Exception as e:
         if logger:
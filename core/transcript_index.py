@@ -0,0 +1,329 @@
+# core/transcript_index.py
+import argparse
+import bisect
+import gc
+import glob
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+INDEX_FILENAME = "index.jsonl"
+POSTINGS_FILENAME = "index_postings.json"  # Per-session postings built from the journal, loaded by queries
+
+_TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """
+    Splits text into lowercase word tokens.
+
+    Returns:
+        list: (token, character offset) pairs in order of appearance
+    """
+    return [(m.group(0).lower(), m.start()) for m in _TOKEN_RE.finditer(text)]
+
+
+def _span_ms(start_s: float, end_s: float) -> Tuple[int, int]:
+    start_ms = int(round(start_s * 1000))
+    return start_ms, max(start_ms, int(round(end_s * 1000)))
+
+
+def append_journal(journal_path: str, chunk_id: str, text: str, start_s: float, end_s: float):
+    """
+    Appends one transcript span to a session's index journal. The writing stage
+    only journals; the index is built from the journal when it is queried.
+    """
+    start_ms, end_ms = _span_ms(start_s, end_s)
+    entry = {"chunk_id": chunk_id, "start_ms": start_ms, "end_ms": end_ms, "text": text}
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+@dataclass(frozen=True)
+class IndexHit:
+    session_id: str
+    offset_ms: int
+    chunk_id: str
+    phrase: str  # The matched words as they appear in the transcript
+
+
+class TranscriptIndex:
+    """
+    Inverted index from word tokens to time-anchored positions in session transcripts.
+
+    Every indexed token gets a per-session position. Postings map a token to the
+    positions it occurs at, so phrase queries are resolved by intersecting
+    consecutive positions, and prefix queries by a range scan over the sorted
+    vocabulary. Each position carries its global audio offset (ms), chunk id and
+    the word as written.
+
+    When `journal_path` is set, every added span is also appended to that file so
+    the index can be rebuilt across sessions with `TranscriptIndex.load`. The
+    postings of each session are saved next to its journal (POSTINGS_FILENAME)
+    on first load, so later loads only read them instead of re-indexing.
+
+    With `max_tokens_per_session`, the oldest half of a session's tokens is
+    evicted whenever it grows past the cap; the journal still has all of them.
+    """
+    def __init__(self, journal_path: Optional[str] = None, max_tokens_per_session: Optional[int] = None):
+        self.journal_path = journal_path
+        self.max_tokens_per_session = max_tokens_per_session
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+        self._anchors: Dict[str, List[Tuple[int, str, str]]] = {}
+        self._base: Dict[str, int] = {}  # Position of anchors[session][0] after evictions
+        self._saved: Dict[str, dict] = {}  # Loaded session data whose anchors are not built yet
+        self._vocab: List[str] = []
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, chunk_id: str, text: str, start_s: float, end_s: float):
+        """
+        Indexes one transcript span.
+
+        Token offsets are interpolated linearly over [start_s, end_s] by character
+        position, which is as precise as segment-level timestamps allow. The span
+        must cover exactly `text`, so callers pass the times of the text they kept.
+        """
+        tokens = [(m.group(0).lower(), m.start(), m.group(0)) for m in _TOKEN_RE.finditer(text)]
+        if not tokens:
+            return
+
+        start_ms, end_ms = _span_ms(start_s, end_s)
+        span_ms = end_ms - start_ms
+        text_len = max(len(text), 1)
+
+        with self._lock:
+            anchors = self._session_anchors(session_id)
+            base = self._base.setdefault(session_id, 0)
+            for token, char_pos, word in tokens:
+                position = base + len(anchors)
+                anchors.append((start_ms + span_ms * char_pos // text_len, chunk_id, word))
+
+                sessions = self._postings.get(token)
+                if sessions is None:
+                    sessions = self._postings[token] = {}
+                    bisect.insort(self._vocab, token)
+                sessions.setdefault(session_id, []).append(position)
+
+            if self.max_tokens_per_session and len(anchors) > self.max_tokens_per_session:
+                self._evict_oldest(session_id)
+
+        if self.journal_path:
+            append_journal(self.journal_path, chunk_id, text, start_s, end_s)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[IndexHit]:
+        """
+        Finds phrase and prefix matches.
+
+        A query of several words matches them as a consecutive phrase. A trailing
+        `*` on the last word turns it into a prefix match, e.g. "noise fl*".
+
+        Returns:
+            list: Hits ordered by session and audio offset
+        """
+        prefix = query.rstrip().endswith("*")
+        terms = [t for t, _ in tokenize(query)]
+        if not terms:
+            return []
+
+        with self._lock:
+            # Candidate postings for each query position
+            term_postings = []
+            for i, term in enumerate(terms):
+                if prefix and i == len(terms) - 1:
+                    postings = self._prefix_postings(term)
+                else:
+                    postings = self._postings.get(term, {})
+                if not postings:
+                    return []
+                term_postings.append(postings)
+
+            hits = []
+            session_ids = set(term_postings[0]).intersection(*term_postings[1:])
+            for session_id in sorted(session_ids):
+                # Anchor on the rarest term, then verify the others by set lookup
+                lists = [postings[session_id] for postings in term_postings]
+                rarest = min(range(len(lists)), key=lambda i: len(lists[i]))
+                starts = [p - rarest for p in lists[rarest]]
+                for i, positions in enumerate(lists):
+                    if i == rarest or not starts:
+                        continue
+                    lookup = positions if isinstance(positions, set) else set(positions)
+                    starts = [p for p in starts if p + i in lookup]
+
+                anchors = self._session_anchors(session_id)
+                base = self._base[session_id]
+                for pos in sorted(starts):
+                    if pos < base:
+                        continue  # Phrase started in an evicted span
+                    offset_ms, chunk_id, _ = anchors[pos - base]
+                    phrase = " ".join(word for _, _, word in anchors[pos - base:pos - base + len(terms)])
+                    hits.append(IndexHit(session_id, offset_ms, chunk_id, phrase))
+                    if limit is not None and len(hits) >= limit:
+                        return hits
+            return hits
+
+    def _evict_oldest(self, session_id: str):
+        anchors = self._anchors[session_id]
+        drop = len(anchors) // 2
+        cutoff = self._base[session_id] + drop
+        self._anchors[session_id] = anchors[drop:]
+        self._base[session_id] = cutoff
+
+        for token in list(self._postings):
+            sessions = self._postings[token]
+            positions = sessions.get(session_id)
+            if positions is None:
+                continue
+            keep = positions[bisect.bisect_left(positions, cutoff):]
+            if keep:
+                sessions[session_id] = keep
+            else:
+                del sessions[session_id]
+                if not sessions:
+                    del self._postings[token]
+        self._vocab = sorted(self._postings)
+
+    def _prefix_postings(self, prefix: str) -> Dict[str, set]:
+        merged: Dict[str, set] = {}
+        start = bisect.bisect_left(self._vocab, prefix)
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            for session_id, positions in self._postings[token].items():
+                merged.setdefault(session_id, set()).update(positions)
+        return merged
+
+    def _session_anchors(self, session_id: str) -> List[Tuple[int, str, str]]:
+        # Loaded sessions build their anchors on first use; most queries only reach a few sessions
+        data = self._saved.pop(session_id, None)
+        if data is not None:
+            chunk_ids = [chunk_id for count, chunk_id in data["chunks"] for _ in range(count)]
+            self._anchors[session_id] = list(zip(data["offsets"], chunk_ids, data["words"]))
+        return self._anchors.setdefault(session_id, [])
+
+    def token_count(self) -> int:
+        with self._lock:
+            return sum(len(a) for a in self._anchors.values()) + sum(len(d["offsets"]) for d in self._saved.values())
+
+    def session_data(self, session_id: str) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable postings and anchors of one session
+        """
+        with self._lock:
+            anchors = self._session_anchors(session_id)
+            chunk_runs = []  # [count, chunk_id]: consecutive tokens of one chunk
+            for _, chunk_id, _ in anchors:
+                if chunk_runs and chunk_runs[-1][1] == chunk_id:
+                    chunk_runs[-1][0] += 1
+                else:
+                    chunk_runs.append([1, chunk_id])
+            return {
+                "base": self._base.get(session_id, 0),
+                "offsets": [a[0] for a in anchors],
+                "chunks": chunk_runs,
+                "words": [a[2] for a in anchors],
+                "postings": {token: sessions[session_id] for token, sessions in self._postings.items()
+                             if session_id in sessions},
+            }
+
+    def _merge_session(self, session_id: str, data: dict):
+        # Callers re-sort the vocabulary once all sessions are merged
+        with self._lock:
+            self._base[session_id] = data["base"]
+            self._anchors.pop(session_id, None)
+            self._saved[session_id] = {name: data[name] for name in ("offsets", "chunks", "words")}
+            for token, positions in data["postings"].items():
+                self._postings.setdefault(token, {})[session_id] = positions
+
+    @classmethod
+    def load(cls, sessions_root: str, logger=None) -> "TranscriptIndex":
+        """
+        Loads the index of every session under `sessions_root`: from the saved
+        postings where they are up to date with the journal, otherwise by
+        re-indexing the journal (and saving the postings for next time).
+        """
+        index = cls()
+        pattern = os.path.join(sessions_root, "*", "transcripts", INDEX_FILENAME)
+        # Millions of long-lived lists are created here; collecting them mid-load only costs time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for path in sorted(glob.glob(pattern)):
+                session_id = os.path.basename(os.path.dirname(os.path.dirname(path)))
+                try:
+                    data = _read_postings(path)
+                    if data is None:
+                        data = persist_session_index(path, session_id, logger)
+                    index._merge_session(session_id, data)
+                except Exception as e:
+                    if logger:
+                        logger.warning(f"Failed to load transcript index {path}: {e}")
+        finally:
+            if gc_enabled:
+                gc.enable()
+        with index._lock:
+            index._vocab = sorted(index._postings)
+        return index
+
+
+def _read_postings(journal_path: str) -> Optional[dict]:
+    # Saved postings are valid while the journal has not grown since they were built
+    path = os.path.join(os.path.dirname(journal_path), POSTINGS_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if data.get("journal_bytes") == os.path.getsize(journal_path) else None
+
+
+def persist_session_index(journal_path: str, session_id: str, logger=None) -> dict:
+    """
+    Indexes one session's journal and saves the postings next to it.
+
+    Returns:
+        dict: The saved session data (see `TranscriptIndex.session_data`)
+    """
+    journal_bytes = os.path.getsize(journal_path)
+    index = TranscriptIndex()
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line still being written by a live session
+            index.add(session_id, entry["chunk_id"], entry["text"],
+                      entry["start_ms"] / 1000.0, entry["end_ms"] / 1000.0)
+
+    data = index.session_data(session_id)
+    data["journal_bytes"] = journal_bytes
+    path = os.path.join(os.path.dirname(journal_path), POSTINGS_FILENAME)
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        if logger:
+            logger.warning(f"Could not save transcript index postings {path}: {e}")
+    return data
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Search session transcripts.")
+    parser.add_argument("query", help='Words to find; end with * for a prefix match, e.g. "noise fl*"')
+    parser.add_argument("--sessions", default=os.path.join(project_root, "sessions"))
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    index = TranscriptIndex.load(args.sessions)
+    for hit in index.search(args.query, limit=args.limit):
+        print(f"{hit.session_id}  {hit.offset_ms / 1000.0:9.2f}s  {hit.chunk_id}  {hit.phrase}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,44 @@
 import wave
 import os
 import numpy as np
-import webrtcvad
 
 from config.config import (
     SILENCE_THRESHOLD, CHANNELS, AUDIO_FORMAT as CONFIG_AUDIO_FORMAT,
-    FRAME_DURATION, SAMPLE_RATE, VAD_MODE, RMS_PREFILTER_THRESHOLD
+    SAMPLE_RATE, VAD_MODE, VAD_BACKEND, RMS_PREFILTER_THRESHOLD
 )
+from config.runtime import runtime_config
+from core.vad import NumpyVadBackend, create_vad_backend
 from typing import Optional, Dict
 import json
 
-# Initialize VAD instance using VAD_MODE from config
+# Initialize the VAD backend selected in config. The session logger does not
+# exist yet at import time, so a fallback is reported with the first chunk,
+# which also hands the logger to the backend for its own errors.
+_vad_fallback_warning = None
 try:
-    _VAD_MODE_CONFIG = VAD_MODE
-    if not (0 <= _VAD_MODE_CONFIG <= 3):
-        _VAD_MODE_CONFIG = max(0, min(3, _VAD_MODE_CONFIG))
-    vad = webrtcvad.Vad(_VAD_MODE_CONFIG)
-except Exception:
-    vad = webrtcvad.Vad(1)
+    vad_backend = create_vad_backend(VAD_BACKEND, VAD_MODE)
+except ImportError as e:
+    vad_backend = NumpyVadBackend(VAD_MODE)
+    _vad_fallback_warning = f"VAD backend '{VAD_BACKEND}' unavailable ({e}); using '{vad_backend.name}' instead."
+
+
+def _sync_vad_mode(logger):
+    global _vad_fallback_warning
+    if _vad_fallback_warning:
+        logger.warning(_vad_fallback_warning)
+        _vad_fallback_warning = None
+    if getattr(vad_backend, "logger", False) is None:
+        vad_backend.logger = logger
+    # Picks up VAD aggressiveness changes made through the runtime config
+    mode = max(0, min(3, runtime_config.vad_mode))
+    if mode != vad_backend.mode:
+        logger.info(f"VAD mode changed: {vad_backend.mode} -> {mode}")
+        vad_backend.set_mode(mode)
+
+
+def compute_rms(audio_int16: np.ndarray) -> float:
+    audio_float = audio_int16.astype(np.float32) / 32768.0
+    return float(np.sqrt(np.mean(audio_float ** 2))) if audio_float.size else 0.0
 
 
 def is_chunk_speech(audio_chunk_int16: np.ndarray, sample_rate: int, logger) -> bool:
@@ -30,43 +51,13 @@ def is_chunk_speech(audio_chunk_int16: np.ndarray, sample_rate: int, logger) ->
             logger.error("Failed to convert audio_chunk to np.int16. Treating as non-speech.")
             return False
 
-    frame_duration_ms = int(FRAME_DURATION * 1000)
-    if frame_duration_ms not in [10, 20, 30]:
-        logger.warning(f"VAD: Configured FRAME_DURATION ({FRAME_DURATION}s -> {frame_duration_ms}ms) not supported. Using 30ms.")
-        frame_duration_ms = 30
-
-    samples_per_frame = int(sample_rate * frame_duration_ms / 1000)
-    bytes_per_sample = np.dtype(np.int16).itemsize
-    voiced_frames_count = 0
-    total_frames_in_chunk = 0
-
-    if len(audio_chunk_int16) < samples_per_frame:
-        logger.debug(f"is_chunk_speech: Chunk too short ({len(audio_chunk_int16)} samples)")
-        return False
-
-    offset = 0
-    while offset + samples_per_frame <= len(audio_chunk_int16):
-        frame = audio_chunk_int16[offset: offset + samples_per_frame]
-        offset += samples_per_frame
-        total_frames_in_chunk += 1
-        frame_bytes = frame.tobytes()
-
-        expected_byte_len = samples_per_frame * bytes_per_sample
-        actual_byte_len = len(frame_bytes)
-        if actual_byte_len != expected_byte_len:
-            logger.error(f"Frame byte length mismatch for VAD: expected {expected_byte_len}, got {actual_byte_len}")
-            continue
-
-        try:
-            is_speech_result = vad.is_speech(frame_bytes, sample_rate)
-            if is_speech_result:
-                voiced_frames_count += 1
-        except Exception as e:
-            logger.error(f"VAD processing error: {e}")
-            continue
+    _sync_vad_mode(logger)
+    decisions = vad_backend.frame_decisions(audio_chunk_int16, sample_rate)
+    voiced_frames_count = int(decisions.sum())
+    total_frames_in_chunk = len(decisions)
 
     if total_frames_in_chunk == 0:
-        logger.debug("is_chunk_speech: No frames were processed.")
+        logger.debug(f"is_chunk_speech: Chunk too short ({len(audio_chunk_int16)} samples)")
         return False
 
     ratio_voiced = voiced_frames_count / total_frames_in_chunk
@@ -88,8 +79,7 @@ def process_audio_chunk_for_speech(audio_chunk_int16: np.ndarray, sample_rate: i
         logger.debug(f"ProcessChunk ({chunk_id_str}): Received empty audio chunk. Skipping.")
         return None
 
-    audio_float_for_rms = audio_chunk_int16.astype(np.float32) / 32768.0
-    rms_energy = np.sqrt(np.mean(audio_float_for_rms ** 2))
+    rms_energy = compute_rms(audio_chunk_int16)
 
     logger.debug(f"ProcessChunk ({chunk_id_str}): RMS energy = {rms_energy:.6f} (Threshold: {RMS_PREFILTER_THRESHOLD})")
 
@@ -0,0 +1,172 @@
+# core/vad.py
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+try:
+    import webrtcvad
+except ImportError:  # Only needed by the webrtc backend
+    webrtcvad = None
+
+from config.config import FRAME_DURATION
+
+
+class VadBackend(ABC):
+    """
+    Frame-level voice activity detection.
+
+    `frame_decisions` classifies consecutive FRAME_DURATION frames of an int16
+    chunk; a trailing partial frame is ignored. `speech_ratios` classifies a
+    batch of chunks, e.g. one per stream.
+    """
+    name = "base"
+
+    def __init__(self, mode: int = 1):
+        self.mode = max(0, min(3, mode))
+
+    def set_mode(self, mode: int):
+        self.mode = max(0, min(3, mode))
+
+    @abstractmethod
+    def frame_decisions(self, audio_int16: np.ndarray, sample_rate: int) -> np.ndarray:
+        ...
+
+    def speech_ratios(self, chunks: Sequence[np.ndarray], sample_rate: int) -> np.ndarray:
+        ratios = []
+        for chunk in chunks:
+            decisions = self.frame_decisions(chunk, sample_rate)
+            ratios.append(decisions.mean() if len(decisions) else 0.0)
+        return np.array(ratios)
+
+
+class WebRtcVadBackend(VadBackend):
+    """
+    webrtcvad, called once per 10/20/30 ms frame at 8/16/32/48 kHz.
+    """
+    name = "webrtc"
+
+    def __init__(self, mode: int = 1, logger=None):
+        if webrtcvad is None:
+            raise ImportError("webrtcvad is not installed; use VAD_BACKEND = 'numpy' or install webrtcvad")
+        super().__init__(mode)
+        self.logger = logger
+        self.vad = webrtcvad.Vad(self.mode)
+        self.frame_duration_ms = int(FRAME_DURATION * 1000)
+        if self.frame_duration_ms not in [10, 20, 30]:
+            if logger:
+                logger.warning(f"VAD: Configured FRAME_DURATION ({FRAME_DURATION}s -> {self.frame_duration_ms}ms) "
+                               f"not supported. Using 30ms.")
+            self.frame_duration_ms = 30
+
+    def set_mode(self, mode: int):
+        super().set_mode(mode)
+        self.vad.set_mode(self.mode)
+
+    def frame_decisions(self, audio_int16: np.ndarray, sample_rate: int) -> np.ndarray:
+        samples_per_frame = int(sample_rate * self.frame_duration_ms / 1000)
+        audio_int16 = audio_int16.reshape(-1)
+        n_frames = len(audio_int16) // samples_per_frame
+        decisions = np.zeros(n_frames, dtype=bool)
+        for i in range(n_frames):
+            frame = audio_int16[i * samples_per_frame:(i + 1) * samples_per_frame]
+            try:
+                decisions[i] = self.vad.is_speech(frame.tobytes(), sample_rate)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"VAD processing error: {e}")
+        return decisions
+
+
+class NumpyVadBackend(VadBackend):
+    """
+    Vectorized VAD: every frame of a chunk, or of a batch of equal-length
+    chunks, is classified in one pass over a strided (chunks, frames, samples) view.
+    Batches are split into passes of at most BLOCK_SAMPLES, so batching only
+    saves per-call overhead for short chunks (e.g. streaming frames from many
+    streams); for multi-second chunks a batch costs the same as separate calls.
+
+    A frame is speech when it is loud enough, its zero-crossing rate is in the
+    voice range (rejects hiss), and it is spectrally peaky within the speech
+    band (low spectral flatness, as for voiced speech; noise is flat, and mains
+    hum lies below the band). The spectrum is only computed for frames that
+    pass the cheap energy and ZCR checks, at half the sample rate.
+    Works at any sample rate and frame length. Higher modes are stricter.
+    """
+    name = "numpy"
+
+    ENERGY_FLOOR_DB = (-55.0, -50.0, -45.0, -40.0)  # Frame RMS, dBFS
+    FLATNESS_MAX = (0.45, 0.35, 0.30, 0.25)
+    ZCR_RANGE = (0.005, 0.35)  # Zero crossings per sample
+    BAND_HZ = (250.0, 4000.0)  # Band used for spectral flatness
+    BLOCK_SAMPLES = 1 << 16  # Samples per vectorized pass in speech_ratios
+
+    def __init__(self, mode: int = 1, frame_duration: float = FRAME_DURATION):
+        super().__init__(mode)
+        self.frame_duration = frame_duration
+        self._windows = {}
+
+    def _window(self, length: int) -> np.ndarray:
+        if length not in self._windows:
+            self._windows[length] = np.hanning(length)
+        return self._windows[length]
+
+    def _flatness(self, frames: np.ndarray, sample_rate: int) -> np.ndarray:
+        # Pairwise averaging halves the rate (a mild low-pass), enough for a band below sample_rate / 4
+        half = frames[:, 0:frames.shape[1] // 2 * 2:2] + frames[:, 1::2][:, :frames.shape[1] // 2]
+        n_fft = 1 << (half.shape[1] - 1).bit_length()
+        spectrum = np.fft.rfft(half * self._window(half.shape[1]), n=n_fft, axis=-1)
+        freqs = np.fft.rfftfreq(n_fft, 2.0 / sample_rate)
+        band = (freqs >= self.BAND_HZ[0]) & (freqs <= min(self.BAND_HZ[1], sample_rate / 4))
+        power = spectrum.real[:, band] ** 2 + spectrum.imag[:, band] ** 2 + 1e-12
+        return np.exp(np.mean(np.log(power), axis=-1)) / np.mean(power, axis=-1)
+
+    def _batch_decisions(self, batch_int16: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Args:
+            batch_int16 (np.ndarray): (chunks, samples)
+
+        Returns:
+            np.ndarray: (chunks, frames) bool
+        """
+        frame_len = int(sample_rate * self.frame_duration)
+        n_frames = batch_int16.shape[-1] // frame_len
+        frames = batch_int16[:, :n_frames * frame_len].reshape(len(batch_int16), n_frames, frame_len)
+        frames = frames.astype(np.float32) / 32768.0
+
+        energy_db = 10.0 * np.log10(np.mean(frames ** 2, axis=-1) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[..., 1:] != signs[..., :-1], axis=-1)
+        decisions = ((energy_db > self.ENERGY_FLOOR_DB[self.mode])
+                     & (zcr >= self.ZCR_RANGE[0]) & (zcr <= self.ZCR_RANGE[1]))
+        if decisions.any():
+            decisions[decisions] = self._flatness(frames[decisions].astype(np.float64), sample_rate) \
+                < self.FLATNESS_MAX[self.mode]
+        return decisions
+
+    def frame_decisions(self, audio_int16: np.ndarray, sample_rate: int) -> np.ndarray:
+        return self._batch_decisions(audio_int16.reshape(1, -1), sample_rate)[0]
+
+    def speech_ratios(self, chunks: Sequence[np.ndarray], sample_rate: int) -> np.ndarray:
+        chunks = [c.reshape(-1) for c in chunks]
+        ratios = np.zeros(len(chunks))
+        for length in {len(c) for c in chunks}:
+            idx = [i for i, c in enumerate(chunks) if len(c) == length]
+            # Chunks of equal length share a pass, in blocks small enough for the float32 temporaries to stay in cache
+            per_block = max(1, self.BLOCK_SAMPLES // max(length, 1))
+            for start in range(0, len(idx), per_block):
+                block = idx[start:start + per_block]
+                decisions = self._batch_decisions(np.stack([chunks[i] for i in block]), sample_rate)
+                ratios[block] = decisions.mean(axis=-1) if decisions.shape[-1] else 0.0
+        return ratios
+
+
+VAD_BACKENDS = {WebRtcVadBackend.name: WebRtcVadBackend, NumpyVadBackend.name: NumpyVadBackend}
+
+
+def create_vad_backend(name: str, mode: int, logger=None) -> VadBackend:
+    if name not in VAD_BACKENDS:
+        raise ValueError(f"Unknown VAD backend '{name}'; expected one of {sorted(VAD_BACKENDS)}")
+    if name == WebRtcVadBackend.name:
+        return WebRtcVadBackend(mode, logger=logger)
+    return VAD_BACKENDS[name](mode)
@@ -0,0 +1,73 @@
+import types
+
+from config.config import BEAM_SIZE_BOUNDS, OVERLAP_DURATION_BOUNDS
+from config.runtime import RuntimeConfig
+from core.auto_tuner import LatencyAutoTuner
+
+
+def _tuner(load, **settings):
+    stats = types.SimpleNamespace(recent_load=lambda window: load[0])
+    config = RuntimeConfig(**settings)
+    return LatencyAutoTuner(stats, config=config, target_latency_s=10.0, interval=1), config
+
+
+def test_overload_lowers_beam_then_overlap():
+    load = [(0.95, 0.0)]
+    tuner, config = _tuner(load, chunk_duration=3.0, overlap_duration=0.4, beam_size=2)
+    tuner.observe()
+    assert config.beam_size == BEAM_SIZE_BOUNDS[0]
+    tuner.observe()
+    assert config.overlap_duration == 0.3
+    assert config.chunk_duration == 3.0
+
+
+def test_overload_below_full_utilization_does_not_lengthen_chunks():
+    load = [(0.75, 3.0)]  # Queue backed up, but ASR keeps up on average (utilization ~0.8)
+    tuner, config = _tuner(load, chunk_duration=3.0, overlap_duration=OVERLAP_DURATION_BOUNDS[0],
+                           beam_size=BEAM_SIZE_BOUNDS[0])
+    for _ in range(5):
+        tuner.observe()
+    assert config.chunk_duration == 3.0
+    assert not tuner.history
+
+
+def test_lengthening_keeps_reduced_overlap():
+    load = [(1.1, 0.0)]
+    tuner, config = _tuner(load, chunk_duration=3.0, overlap_duration=0.5, beam_size=BEAM_SIZE_BOUNDS[0])
+    for _ in range(3):
+        tuner.observe()
+    assert config.overlap_duration == OVERLAP_DURATION_BOUNDS[0]
+    tuner.observe()
+    assert config.chunk_duration == 3.5
+    assert config.overlap_duration == OVERLAP_DURATION_BOUNDS[0]
+
+
+def test_shortening_clamps_overlap_to_half_chunk():
+    load = [(0.1, 0.0)]
+    tuner, config = _tuner(load, chunk_duration=2.0, overlap_duration=0.9, beam_size=BEAM_SIZE_BOUNDS[0])
+    tuner.target_latency_s = 1.0
+    tuner.observe()
+    assert config.chunk_duration == 1.5
+    assert config.overlap_duration == 0.75
+
+
+def test_no_oscillation_after_overload_clears():
+    load = [(1.1, 0.0)]
+    tuner, config = _tuner(load, chunk_duration=3.0, overlap_duration=0.3, beam_size=BEAM_SIZE_BOUNDS[0])
+    for _ in range(2):
+        tuner.observe()
+    overlap = config.overlap_duration
+    load[0] = (0.6, 0.0)  # Settled below the overload threshold, within the latency target
+    for _ in range(10):
+        tuner.observe()
+    assert config.overlap_duration == overlap
+    assert all(entry["reason"] != "over latency target" for entry in tuner.history)
+
+
+def test_context_prompt_session_keeps_zero_overlap_when_resizing():
+    load = [(1.1, 0.0)]
+    tuner, config = _tuner(load, chunk_duration=3.0, overlap_duration=0.0, beam_size=BEAM_SIZE_BOUNDS[0])
+    tuner.context_prompt = True
+    tuner.observe()
+    assert config.chunk_duration == 3.5
+    assert config.overlap_duration == 0.0
@@ -0,0 +1,120 @@
+import threading
+import time
+import types
+
+from config.session_stats import SessionStats
+from core.events import EventBus, TranscriptEvent, DROP_NEWEST, DROP_OLDEST, PARAGRAPH_UPDATE, PARTIAL
+from core.pipeline import Pipeline
+from core.sinks import close_event_bus
+
+
+def _event(i: int, kind: str = PARAGRAPH_UPDATE) -> TranscriptEvent:
+    return TranscriptEvent(kind=kind, session_id="test", paragraph_id=0, text=str(i), delta=str(i),
+                           start=float(i), end=float(i), chunk_id=f"chunk_{i:04d}")
+
+
+class BlockedSink:
+    def __init__(self):
+        self.gate = threading.Event()
+        self.received = []
+
+    def __call__(self, event):
+        self.gate.wait()
+        self.received.append(event.text)
+
+
+def _wait_for(condition, timeout_s: float = 2.0):
+    end = time.monotonic() + timeout_s
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+def test_drop_oldest_keeps_latest_events():
+    stats, sink = SessionStats(), BlockedSink()
+    bus = EventBus(stats=stats)
+    subscription = bus.subscribe("slow", sink, maxsize=3, drop_policy=DROP_OLDEST)
+    bus.publish(_event(0))
+    _wait_for(lambda: subscription.backlog() == 0)  # Event 0 is being handled
+    for i in range(1, 6):
+        bus.publish(_event(i))
+    sink.gate.set()
+    assert bus.close(2.0) == 0
+    assert sink.received == ["0", "3", "4", "5"]
+    assert subscription.dropped == 2
+    assert stats.sink_drops["slow"] == 2
+
+
+def test_drop_newest_keeps_earliest_events():
+    sink = BlockedSink()
+    bus = EventBus()
+    subscription = bus.subscribe("slow", sink, maxsize=3, drop_policy=DROP_NEWEST)
+    bus.publish(_event(0))
+    _wait_for(lambda: subscription.backlog() == 0)
+    for i in range(1, 6):
+        bus.publish(_event(i))
+    sink.gate.set()
+    bus.close(2.0)
+    assert sink.received == ["0", "1", "2", "3"]
+    assert subscription.dropped == 2
+
+
+def test_kinds_filter_events():
+    received = []
+    bus = EventBus()
+    bus.subscribe("paragraphs", lambda e: received.append(e.kind), kinds=(PARAGRAPH_UPDATE,))
+    bus.publish(_event(0, PARTIAL))
+    bus.publish(_event(1))
+    bus.close(2.0)
+    assert received == [PARAGRAPH_UPDATE]
+
+
+def test_close_counts_undelivered_events_once():
+    stats, sink = SessionStats(), BlockedSink()
+    bus = EventBus(stats=stats)
+    bus.subscribe("stuck", sink, maxsize=10)
+    for i in range(4):
+        bus.publish(_event(i))
+
+    assert bus.close(0.1) == 3  # One is in the handler, three are still queued
+    assert bus.close(0.1) == 0
+    assert stats.abandoned_items["sink:stuck"] == 3
+    sink.gate.set()
+
+
+def test_events_published_after_close_are_counted_as_dropped():
+    stats = SessionStats()
+    bus = EventBus(stats=stats)
+    subscription = bus.subscribe("sink", lambda e: None)
+    bus.close(1.0)
+    bus.publish(_event(0))
+    assert subscription.dropped == 1
+    assert stats.sink_drops["sink"] == 1
+
+
+def test_bus_is_closed_when_the_pipeline_aborts():
+    stats, sink = SessionStats(), BlockedSink()
+    session = types.SimpleNamespace(event_bus=EventBus(stats=stats))
+    session.event_bus.subscribe("stuck", sink, maxsize=10)
+
+    def slow_writer(i):
+        time.sleep(0.05)
+        session.event_bus.publish(_event(i))
+
+    pipeline = Pipeline(stats=stats)
+    pipeline.add_stage("Writer", slow_writer, on_drain=lambda: session.event_bus.close(1.0))
+    pipeline.start()
+    for i in range(20):
+        pipeline.stages[0].inbox.put(i)
+    assert pipeline.shutdown(deadline_s=0.2) > 0
+    assert all(s.thread.is_alive() for s in session.event_bus.subscriptions.values())  # Drain was skipped
+
+    lost = close_event_bus(session, deadline_s=0.1)
+    assert lost > 0
+    assert stats.abandoned_items["sink:stuck"] == lost
+    sink.gate.set()
+    _wait_for(lambda: not session.event_bus.subscriptions["stuck"].thread.is_alive())
+    assert not session.event_bus.subscriptions["stuck"].thread.is_alive()
+
+
+def test_close_event_bus_without_bus():
+    assert close_event_bus(types.SimpleNamespace()) == 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from core.features import LogMelRing, PrecomputedFeatureExtractor
+
+FeatureExtractor = pytest.importorskip("faster_whisper.feature_extractor").FeatureExtractor
+
+PARITY_TOLERANCE = 1e-6
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return FeatureExtractor()
+
+
+@pytest.fixture(scope="module")
+def audio():
+    rng = np.random.default_rng(0)
+    t = np.arange(12 * 16000) / 16000
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 0.5 * t)) + rng.normal(0, 0.02, len(t))
+    return (signal * 32767).astype(np.int16)
+
+
+def _ring(extractor) -> LogMelRing:
+    return LogMelRing(extractor.mel_filters, n_fft=extractor.n_fft, hop_length=extractor.hop_length, capacity_s=30)
+
+
+def test_overlapping_chunks_match_feature_extractor(extractor, audio):
+    ring = _ring(extractor)
+    chunk, step = 3 * 16000, int(2.5 * 16000)
+    for start in range(0, len(audio) - chunk + 1, step):
+        samples = audio[start:start + chunk]
+        expected = extractor(samples.astype(np.float32) / 32768.0)
+        features = ring.window(start, samples)
+        assert features.shape == expected.shape
+        assert np.abs(features - expected).max() < PARITY_TOLERANCE
+    assert ring.frames_reused > 0
+
+
+def test_growing_streaming_buffer_matches_feature_extractor(extractor, audio):
+    ring = _ring(extractor)
+    buffer_start = 16000  # A trimmed buffer: starts later in the session
+    for end in range(buffer_start + 16000, len(audio) + 1, 8000):
+        samples = audio[buffer_start:end]
+        expected = extractor(samples.astype(np.float32) / 32768.0)
+        assert np.abs(ring.window(buffer_start, samples) - expected).max() < PARITY_TOLERANCE
+    # Only the new audio and the edge frames are featurized again
+    assert ring.frames_reused > ring.frames_computed
+
+
+def test_unaligned_or_short_audio_is_not_served(extractor, audio):
+    ring = _ring(extractor)
+    assert ring.window(80, audio[:16000]) is None
+    assert ring.window(0, audio[:100]) is None
+
+
+def test_ring_overwrites_old_frames(extractor, audio):
+    ring = LogMelRing(extractor.mel_filters, capacity_s=2)
+    ring.window(0, audio[:3 * 16000])
+    computed = ring.frames_computed
+    ring.window(0, audio[:3 * 16000])  # The first second has been overwritten by the rest
+    assert ring.frames_computed - computed > 100
+
+
+def test_precomputed_extractor_serves_provided_features_only(extractor, audio):
+    shim = PrecomputedFeatureExtractor(extractor)
+    waveform = audio[:16000].astype(np.float32) / 32768.0
+    features = np.zeros((80, 3), dtype=np.float32)
+    with shim.provide(waveform, features):
+        assert shim(waveform) is features
+        other = waveform.copy()
+        assert shim(other).shape == extractor(other).shape
+    assert shim(waveform) is not features
+    assert shim.n_fft == extractor.n_fft
@@ -0,0 +1,102 @@
+import types
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from config.session_stats import SessionStats
+from core import transcriber
+from core.language_lock import LanguageLock
+
+
+def _lock(**kwargs):
+    return LanguageLock(min_detections=3, min_probability=0.8, reprobe_interval=4, reprobe_logprob=-1.0, **kwargs)
+
+
+def test_locks_after_consistent_detections():
+    lock = _lock()
+    for _ in range(3):
+        assert lock.next_language() is None
+        lock.observe("de", 0.95, -0.3, probed=True)
+    assert lock.next_language() == "de"
+
+
+def test_unsure_detection_resets_streak():
+    lock = _lock()
+    lock.observe("de", 0.95, -0.3, probed=True)
+    lock.observe("de", 0.95, -0.3, probed=True)
+    lock.observe("de", 0.5, -0.3, probed=True)
+    lock.observe("de", 0.95, -0.3, probed=True)
+    assert lock.next_language() is None
+
+
+def test_periodic_reprobe_and_release():
+    lock = _lock()
+    for _ in range(3):
+        lock.observe("de", 0.95, -0.3, probed=True)
+    assert [lock.next_language() for _ in range(5)] == ["de", "de", "de", "de", None]
+
+    lock.observe("fr", 0.95, -0.3, probed=True)
+    assert lock.locked_language is None
+
+
+def test_low_logprob_triggers_reprobe():
+    lock = _lock()
+    for _ in range(3):
+        lock.observe("de", 0.95, -0.3, probed=True)
+    language = lock.next_language()
+    lock.observe(language, 1.0, -2.0, probed=False)
+    assert lock.next_language() is None
+
+
+def test_fixed_language_never_probes():
+    lock = _lock(fixed_language="en")
+    lock.observe("de", 0.99, -0.1, probed=True)
+    assert lock.next_language() == "en"
+
+
+class FakeWhisperModel:
+    """
+    Detects "de" with a timed probe; transcribe() reports the language it was given.
+    """
+    def __init__(self):
+        self.feature_extractor = FeatureExtractor()
+        self.model = types.SimpleNamespace(is_multilingual=True)
+        self.transcribe_languages = []
+
+    def detect_language(self, audio=None, features=None):
+        assert features is not None
+        return "de", 0.97, [("de", 0.97)]
+
+    def transcribe(self, audio, language=None, **kwargs):
+        self.transcribe_languages.append(language)
+        segment = types.SimpleNamespace(start=0.0, end=1.0, text=" hallo welt", avg_logprob=-0.2,
+                                        no_speech_prob=0.01, words=None)
+        info = types.SimpleNamespace(language=language, language_probability=1.0, duration=len(audio) / 16000)
+        return iter([segment]), info
+
+
+def test_detected_languages_and_probe_cost_only_count_probes(tmp_path, monkeypatch):
+    fake = FakeWhisperModel()
+    monkeypatch.setattr(transcriber, "model", fake)
+    session = types.SimpleNamespace(session_id="s", transcript_dir=str(tmp_path), language=None)
+    session.language_lock = LanguageLock(min_detections=2, min_probability=0.8, reprobe_interval=100)
+    stats = SessionStats()
+    samples = (np.random.default_rng(0).normal(0, 0.1, 16000) * 32767).astype(np.int16)
+
+    for i in range(5):
+        transcriber.transcribe_chunk("chunk.wav", f"chunk_{i:04d}", i + 1, session, stats,
+                                     samples=samples, start_s=float(i))
+
+    # Two probes lock the language; the other three decodes are given it
+    assert fake.transcribe_languages == ["de"] * 5
+    assert stats.detected_languages == {"de": 2}
+    assert (stats.probed_decodes, stats.locked_decodes) == (2, 3)
+    per_probe, saved, timed = stats.detection_time_saved()
+    assert timed == 2 and saved == per_probe * 3
+
+
+def test_no_probe_cost_with_configured_language():
+    stats = SessionStats()
+    stats.add_language_decode(True)
+    stats.add_language_decode(True)
+    assert stats.detection_time_saved() == (0.0, 0.0, 0)
@@ -0,0 +1,93 @@
+import numpy as np
+
+from core.noise_floor import NoiseFloorEstimator
+
+
+def _frame(rms: float, rng, n: int = 480) -> np.ndarray:
+    return (rng.normal(0, rms, n) * 32768).astype(np.int16)
+
+
+def test_floor_tracks_background_and_ignores_speech_bursts():
+    rng = np.random.default_rng(0)
+    estimator = NoiseFloorEstimator(margin=2.0, min_threshold=0.001)
+    for _ in range(200):
+        estimator.update(_frame(0.01, rng))
+    before = estimator.threshold()
+    assert 0.018 < before < 0.022
+
+    for _ in range(30):  # ~1 s of speech
+        estimator.update(_frame(0.2, rng))
+    assert estimator.threshold() < before * 1.1
+
+
+def test_floor_rises_to_sustained_noise():
+    rng = np.random.default_rng(0)
+    estimator = NoiseFloorEstimator(margin=2.0, min_threshold=0.001, rise_rate=0.01)
+    for _ in range(50):
+        estimator.update(_frame(0.01, rng))
+    for _ in range(500):  # A fan starts up
+        estimator.update(_frame(0.05, rng))
+    assert estimator.threshold() > 0.09
+
+
+def test_threshold_never_below_minimum():
+    estimator = NoiseFloorEstimator(min_threshold=0.003)
+    assert estimator.threshold() == 0.003
+    estimator.update(np.zeros(480, dtype=np.int16))
+    assert estimator.threshold() == 0.003
+
+
+def test_non_speech_feedback_lifts_floor():
+    rng = np.random.default_rng(0)
+    estimator = NoiseFloorEstimator(margin=2.0, min_threshold=0.001)
+    for _ in range(100):
+        estimator.update(_frame(0.01, rng))
+    floor = estimator.floor
+
+    gate = estimator.threshold()
+
+    estimator.register_chunk(1, 0.06)
+    estimator.register_chunk(2, 0.06)
+    estimator.feedback_speech(1)
+    assert estimator.threshold() == gate
+    estimator.feedback_non_speech(2)
+    assert estimator.threshold() == gate + 0.5 * (0.06 - gate)
+    estimator.feedback_non_speech(2)  # Already consumed
+    assert estimator.threshold() == gate + 0.5 * (0.06 - gate)
+    assert estimator.floor == floor
+
+
+def test_non_speech_feedback_survives_quiet_frames():
+    rng = np.random.default_rng(0)
+    estimator = NoiseFloorEstimator(margin=2.0, min_threshold=0.001)
+    for _ in range(100):
+        estimator.update(_frame(0.01, rng))
+    base_gate = estimator.threshold()
+
+    for chunk_index in range(5):  # Chunks at RMS 0.03 that the model keeps reporting as no speech
+        estimator.register_chunk(chunk_index, 0.03)
+        estimator.feedback_non_speech(chunk_index)
+        for _ in range(83):  # The next chunk's worth of 30 ms frames of the same background
+            estimator.update(_frame(0.01, rng))
+        assert estimator.threshold() > base_gate * 1.2
+
+    assert estimator.threshold() > 0.027  # Converged close to the reported level, so such chunks are gated
+
+
+def test_learned_gate_decays():
+    estimator = NoiseFloorEstimator(margin=2.0, min_threshold=0.001, feedback_decay=0.01)
+    frame = (np.ones(480) * 0.01 * 32768).astype(np.int16)
+    estimator.update(frame)
+    estimator.register_chunk(1, 0.1)
+    estimator.feedback_non_speech(1)
+    assert estimator.threshold() > 0.05
+    for _ in range(500):
+        estimator.update(frame)
+    assert abs(estimator.threshold() - 0.02) < 1e-3
+
+
+def test_pending_chunks_are_bounded():
+    estimator = NoiseFloorEstimator(max_pending=4)
+    for i in range(10):
+        estimator.register_chunk(i, 0.1)
+    assert list(estimator._pending) == [6, 7, 8, 9]
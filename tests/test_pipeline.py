@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from audio.chunk_processor import ChunkAssembler
+from config.runtime import runtime_config
+from config.session_stats import SessionStats
+from core.pipeline import STOP, Pipeline, Stage
+from core.session_pipeline import build_pipeline
+from core.sinks import close_event_bus
+
+logger = logging.getLogger("test_pipeline")
+
+
+def test_shutdown_drains_in_flight_items():
+    results, flushed = [], []
+    pipeline = Pipeline(stats=SessionStats())
+    pipeline.add_stage("Double", lambda x: [x * 2], on_drain=lambda: flushed.append(True))
+    pipeline.add_stage("Collect", results.append)
+    pipeline.start()
+    for i in range(20):
+        pipeline.stages[0].inbox.put(i)
+
+    assert pipeline.shutdown(deadline_s=5.0) == 0
+    assert results == [i * 2 for i in range(20)]
+    assert flushed == [True]
+
+
+def test_shutdown_abandons_work_after_deadline():
+    stats, flushed = SessionStats(), []
+
+    def slow(x):
+        time.sleep(0.05)
+        return [x]
+
+    pipeline = Pipeline(stats=stats)
+    pipeline.add_stage("Slow", slow, on_drain=lambda: flushed.append(True))
+    pipeline.start()
+    for i in range(40):
+        pipeline.stages[0].inbox.put(i)
+
+    abandoned = pipeline.shutdown(deadline_s=0.2)
+    stage = pipeline.stages[0]
+    assert 0 < abandoned < 40
+    assert stage.processed + abandoned == 40
+    assert stats.abandoned_items["Slow"] == abandoned
+    assert flushed == []  # Aborted stages skip their drain
+
+
+def test_shutdown_honours_deadline_when_first_inbox_is_full():
+    stats, gate = SessionStats(), threading.Event()
+    inbox = queue.Queue(maxsize=3)
+    pipeline = Pipeline(stats=stats)
+    pipeline.add_stage("Blocked", lambda x: gate.wait() and [], inbox=inbox)
+    pipeline.start()
+    inbox.put(0)
+    while not inbox.empty():  # The stage is now stuck on item 0
+        time.sleep(0.01)
+    for i in range(1, 4):
+        inbox.put(i)
+
+    threading.Timer(0.4, gate.set).start()
+    started = time.monotonic()
+    abandoned = pipeline.shutdown(deadline_s=0.2)
+    assert time.monotonic() - started < 1.5
+    assert abandoned == 3
+    assert stats.abandoned_items["Blocked"] == 3
+    assert not pipeline.stages[0].thread.is_alive()
+
+
+@pytest.fixture(autouse=True)
+def restore_runtime_config():
+    settings = runtime_config.snapshot()
+    yield
+    runtime_config.update(**settings)
+
+
+def _assembler(drops: dict) -> ChunkAssembler:
+    return ChunkAssembler(16000, logger, dropped_before=lambda index: drops.get(index, 0))
+
+
+def test_chunk_start_times_without_drops():
+    runtime_config.update(chunk_duration=1.0, overlap_duration=0.2)
+    assembler = _assembler({})
+    chunks = [c for _ in range(100) for c in assembler.push(np.zeros(480, dtype=np.int16))]
+    assert [c.start_s for c in chunks] == [0.0, 0.8, 1.6]
+
+
+def test_chunk_start_times_include_dropped_frames():
+    runtime_config.update(chunk_duration=1.0, overlap_duration=0.2)
+    # 10 frames (0.3 s) dropped before frame 5, inside the first chunk
+    assembler = _assembler({5: 4800})
+    chunks = [c for _ in range(100) for c in assembler.push(np.zeros(480, dtype=np.int16))]
+    assert [round(c.start_s, 3) for c in chunks] == [0.0, 1.1, 1.9]
+    # Feature keys count received samples only, so overlapping audio keeps its key
+    assert [c.stream_sample for c in chunks] == [0, 12800, 25600]
+
+
+def test_dropped_frames_before_first_frame_shift_buffer_start():
+    runtime_config.update(chunk_duration=1.0, overlap_duration=0.0)
+    assembler = _assembler({0: 1600})
+    chunks = [c for _ in range(40) for c in assembler.push(np.zeros(480, dtype=np.int16))]
+    assert chunks[0].start_s == 0.1
+
+
+def test_context_prompt_session_disables_overlap(tmp_path):
+    runtime_config.update(chunk_duration=3.0, overlap_duration=0.5)
+    audio_manager = types.SimpleNamespace(frame_queue=queue.Queue())
+    session = types.SimpleNamespace(transcript_dir=str(tmp_path), audio_dir=str(tmp_path), context_prompt_mode=True)
+    build_pipeline(16000, audio_manager, session, SessionStats(), logger)
+    close_event_bus(session)
+    assert runtime_config.overlap_duration == 0.0
+
+
+def test_overlap_kept_without_context_prompt(tmp_path):
+    runtime_config.update(chunk_duration=3.0, overlap_duration=0.5)
+    audio_manager = types.SimpleNamespace(frame_queue=queue.Queue())
+    session = types.SimpleNamespace(transcript_dir=str(tmp_path), audio_dir=str(tmp_path), context_prompt_mode=False)
+    build_pipeline(16000, audio_manager, session, SessionStats(), logger)
+    close_event_bus(session)
+    assert runtime_config.overlap_duration == 0.5
+
+
+def test_unfinished_excludes_stop_sentinel():
+    stage = Stage("ASR", lambda x: [x])
+    for item in (1, 2, STOP):
+        stage.inbox.put(item)
+    assert stage.unfinished() == 2
+
+
+def test_stuck_stage_counts_item_in_flight():
+    stats, gate, started = SessionStats(), threading.Event(), threading.Event()
+
+    def stuck(x):
+        started.set()
+        gate.wait()
+        return []
+
+    inbox = queue.Queue(maxsize=3)
+    pipeline = Pipeline(stats=stats)
+    pipeline.add_stage("ASR", stuck, inbox=inbox)
+    pipeline.start()
+    inbox.put(0)
+    started.wait(1.0)
+    for i in range(1, 4):
+        inbox.put(i)
+
+    try:
+        # STOP never fits: three chunks queued and one mid-decode
+        assert pipeline.shutdown(deadline_s=0.1) == 4
+        assert stats.abandoned_items["ASR"] == 4
+    finally:
+        gate.set()
@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+
+from config import session_stats
+from config.runtime import runtime_config
+from config.session import SessionManager
+from config.session_stats import SessionStats
+from core import soak, transcriber
+from core.events import PARAGRAPH_FINAL, PARAGRAPH_UPDATE, EventBus
+from core.text_postprocessor import TranscriptBuffer
+
+
+def test_stats_series_are_capped(monkeypatch):
+    monkeypatch.setattr(session_stats, "STATS_HISTORY_LIMIT", 5)
+    stats = SessionStats()
+    for i in range(20):
+        stats.add_latency(float(i))
+        stats.add_commit_lag(float(i))
+        stats.add_sink_lag("sink", float(i))
+
+    assert list(stats.transcription_latencies) == [15.0, 16.0, 17.0, 18.0, 19.0]
+    assert len(stats.commit_lags) == 5
+    assert len(stats.sink_lags["sink"]) == 5
+
+
+def test_line_history_stays_at_memory_lines():
+    buffer = TranscriptBuffer(memory_lines=4)
+    for i in range(20):
+        buffer.deduplicate(f"line {i} " + "abcdefghij"[i % 10] * (i + 5))
+
+    assert len(buffer.line_history) == 4
+    assert buffer.line_history[-1].startswith("line 19")
+
+
+def test_long_paragraph_is_finalized_and_reset(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcriber, "PARAGRAPH_MAX_CHARS", 30)
+    bus = EventBus()
+    events = []
+    bus.subscribe("collect", events.append)
+    session = types.SimpleNamespace(session_id="s1", transcript_dir=str(tmp_path), event_bus=bus)
+
+    for i in range(4):
+        transcriber.write_paragraph({"chunk_id": f"chunk_{i:04d}", "text": f"sentence number {i}",
+                                     "start": float(i), "end": i + 1.0}, session)
+    bus.close(deadline_s=5.0)
+
+    assert [(e.kind, e.paragraph_id) for e in events] == [
+        (PARAGRAPH_UPDATE, 0), (PARAGRAPH_FINAL, 0), (PARAGRAPH_UPDATE, 1), (PARAGRAPH_FINAL, 1)]
+    assert session.paragraph_buffer == []
+    assert session.paragraph_id == 2
+
+
+def test_growth_per_hour_uses_second_half():
+    # Fast warm-up growth in the first half, 2 MB per hour afterwards
+    samples = [{"audio_hours": h, "rss_mb": 100.0 + 50 * h if h < 2 else 200.0 + 2 * (h - 2)} for h in range(6)]
+    assert soak.growth_per_hour(samples) == pytest.approx(2.0)
+    assert soak.growth_per_hour(samples[:1]) == 0.0
+    assert soak.growth_per_hour([{"audio_hours": 1.0, "rss_mb": 10.0}] * 4) == 0.0
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_soak_smoke_run_drains_and_writes_report(tmp_path, monkeypatch, streaming):
+    class TmpSession(SessionManager):
+        # Keeps the session tree under tmp_path instead of the project's sessions/
+        def _create_directories(self):
+            for name in ("session_root", "audio_dir", "log_dir", "transcript_dir"):
+                setattr(self, name, str(tmp_path / os.path.relpath(getattr(self, name), self.project_root)))
+            super()._create_directories()
+            sessions.append(self)
+
+    def captured_stats():
+        stats.append(SessionStats())
+        return stats[-1]
+
+    sessions, stats = [], []
+    settings = runtime_config.snapshot()
+    monkeypatch.setattr(soak, "SessionManager", TmpSession)
+    monkeypatch.setattr(soak, "SessionStats", captured_stats)
+    monkeypatch.setattr(transcriber, "model", None)
+    args = ["soak", "--hours", "0.05", "--synthetic-asr", "--no-tracemalloc", "--sample-every-min", "1"]
+    monkeypatch.setattr(sys, "argv", args + (["--streaming"] if streaming else []))
+
+    try:
+        with pytest.raises(SystemExit):
+            soak.main()
+    finally:
+        runtime_config.update(**settings)
+
+    with open(os.path.join(sessions[0].log_dir, "soak_report.json"), encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["samples"][-1]["audio_hours"] == pytest.approx(0.05, abs=0.001)
+    assert len(report["samples"]) >= 4
+    assert "growth_mb_per_hour" in report
+    assert stats[0].abandoned_items == {}
+    sink = sessions[0].event_bus.subscriptions["transcript_file"]
+    assert sink.delivered > 0 and sink.dropped == 0
@@ -0,0 +1,162 @@
+import logging
+import types
+
+import numpy as np
+import pytest
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from config.session_stats import SessionStats
+from core import streaming, transcriber
+from core.streaming import StreamingTranscriber
+
+SAMPLE_RATE = 16000
+STEP = 8000  # 0.5 s, one decode per pushed frame
+HOP = 160
+
+logger = logging.getLogger("test_streaming")
+
+# Words at fixed times on the received audio; ends are deliberately off the feature hop
+SCRIPT = [(0.013 + 0.37 * i, 0.324 + 0.37 * i, f"w{i}") for i in range(12)]
+
+
+class ScriptedModel:
+    """
+    Returns the scripted words that lie inside the decoded buffer, relative to its start.
+    With `unstable`, every decode returns three new words instead, so no two decodes agree.
+    """
+    def __init__(self, words=SCRIPT):
+        self.feature_extractor = FeatureExtractor()
+        self.words = words
+        self.unstable = False
+        self.streamer = None
+        self.calls = 0
+
+    def transcribe(self, audio, language=None, **kwargs):
+        self.calls += 1
+        length = len(audio) / SAMPLE_RATE
+        if self.unstable:
+            words = [(i * length / 3, (i + 1) * length / 3, f"u{self.calls}x{i}") for i in range(3)]
+        else:
+            origin = self.streamer.buffer_start_sample / SAMPLE_RATE
+            words = [(s - origin, e - origin, w) for s, e, w in self.words if s >= origin and e <= origin + length]
+        segment = types.SimpleNamespace(
+            start=0.0, end=length, text=" ".join(w for _, _, w in words), avg_logprob=-0.2, no_speech_prob=0.01,
+            words=[types.SimpleNamespace(start=s, end=e, word=f" {w}") for s, e, w in words])
+        info = types.SimpleNamespace(language=language or "en", language_probability=1.0, duration=length)
+        return iter([segment]), info
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = ScriptedModel()
+    monkeypatch.setattr(transcriber, "model", fake)
+    monkeypatch.setattr(streaming, "is_chunk_speech", lambda audio, sample_rate, logger: True)
+    return fake
+
+
+def _streamer(model, **kwargs):
+    stats = SessionStats()
+    streamer = StreamingTranscriber(SAMPLE_RATE, types.SimpleNamespace(language="en"), stats, logger,
+                                    step_s=STEP / SAMPLE_RATE, **kwargs)
+    model.streamer = streamer
+    return streamer, stats
+
+
+def _speech():
+    return np.full(STEP, 3000, dtype=np.int16)
+
+
+def _silence():
+    return np.zeros(STEP, dtype=np.int16)
+
+
+def _committed(updates):
+    return [u["text"] for u in updates if u["kind"] == "committed"]
+
+
+def test_words_commit_only_after_two_decodes_agree(model):
+    streamer, _ = _streamer(model)
+    first = streamer.push(_speech())
+    assert _committed(first) == []
+    assert [u["text"] for u in first if u["kind"] == "partial"] == ["w0"]
+
+    second = streamer.push(_speech())
+    assert _committed(second) == ["w0"]
+    assert [u["text"] for u in second if u["kind"] == "partial"] == ["w1"]
+
+
+def test_buffer_start_stays_on_feature_hop(model):
+    streamer, _ = _streamer(model)
+    assert streamer.trim_step == HOP
+    committed = []
+    for _ in range(8):
+        committed += _committed(streamer.push(_speech()))
+        assert streamer.buffer_start_sample % HOP == 0
+    words = " ".join(committed).split()
+    assert words == [f"w{i}" for i in range(len(words))]
+    assert streamer.buffer_start_sample > 0
+    assert streamer.session.feature_ring.frames_reused > 0
+
+
+def test_buffer_limit_without_agreement_commits_all_but_last_word(model):
+    model.unstable = True
+    streamer, _ = _streamer(model, max_buffer_s=2.0)
+    for _ in range(3):
+        assert _committed(streamer.push(_speech())) == []
+    updates = streamer.push(_speech())  # The buffer reaches 2 s
+    assert _committed(updates) == [f"u{model.calls}x0 u{model.calls}x1"]
+    assert [u["text"] for u in updates if u["kind"] == "partial"] == [f"u{model.calls}x2"]
+    assert streamer.buffer_start_sample % HOP == 0
+
+
+def test_buffer_limit_without_words_trims_to_half(model):
+    model.words = []
+    streamer, _ = _streamer(model, max_buffer_s=2.0)
+    for _ in range(4):
+        assert streamer.push(_speech()) == []
+    assert 16000 <= len(streamer.audio) < 16000 + HOP
+
+
+def test_silence_commits_pending_and_keeps_one_step(model):
+    streamer, _ = _streamer(model)
+    for _ in range(3):
+        streamer.push(_speech())
+    pending = [w["word"] for w in streamer.pending_words]
+    assert pending
+
+    updates = streamer.push(_silence())
+    assert _committed(updates) == [" ".join(pending)]
+    assert streamer.pending_words == []
+    assert not streamer.in_utterance
+    assert STEP <= len(streamer.audio) < STEP + HOP
+
+
+def test_flush_commits_tail_once_with_accounting(model):
+    streamer, stats = _streamer(model)
+    committed = []
+    for _ in range(3):
+        committed += _committed(streamer.push(_speech()))
+    committed += _committed(streamer.flush())
+
+    words = " ".join(committed).split()
+    assert words == [w for s, e, w in SCRIPT if e <= 1.5]
+    assert len(stats.first_word_latencies) == 1  # One utterance
+    assert len(stats.commit_lags) == len(words)
+
+
+def test_dropped_frames_shift_word_times_onto_session_clock(model):
+    drops = {1: 4800}  # 0.3 s dropped before the second frame
+    streamer, _ = _streamer(model, dropped_before=lambda index: drops.get(index, 0))
+    updates = []
+    for _ in range(4):
+        updates += streamer.push(_speech())
+    updates += streamer.flush()
+
+    starts = [(u["text"].split()[0], u["start"]) for u in updates if u["kind"] == "committed"]
+    assert len(starts) > 2
+    for word, start in starts:
+        received = SCRIPT[int(word[1:])][0]
+        # Words received after the gap (at 0.5 s) move by the dropped time
+        assert start == pytest.approx(received + (0.3 if received >= 0.5 else 0.0))
+    assert streamer.buffer_end_s() == pytest.approx(4 * STEP / SAMPLE_RATE + 0.3)
+    assert streamer.buffer_start_sample % HOP == 0
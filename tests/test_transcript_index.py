@@ -0,0 +1,114 @@
+import json
+import types
+
+from core.events import EventBus
+from core.transcript_index import INDEX_FILENAME, POSTINGS_FILENAME, TranscriptIndex, append_journal
+from core.transcriber import postprocess_transcript, write_paragraph
+
+
+def test_phrase_and_prefix_search():
+    index = TranscriptIndex()
+    index.add("s1", "chunk_0001", "Check the pressure readings on line two", 10.0, 13.0)
+    index.add("s2", "chunk_0001", "the pressure is fine", 0.0, 2.0)
+
+    hits = index.search("pressure readings")
+    assert [(h.session_id, h.chunk_id) for h in hits] == [("s1", "chunk_0001")]
+    assert 10000 < hits[0].offset_ms < 13000
+
+    assert [h.session_id for h in index.search("the press*")] == ["s1", "s2"]
+    assert index.search("readings pressure") == []
+
+
+def test_hit_phrase_is_matched_text():
+    index = TranscriptIndex()
+    index.add("s1", "chunk_0001", "Noise Floor estimates, noise-floored", 0.0, 3.0)
+
+    assert [h.phrase for h in index.search("noise fl*")] == ["Noise Floor", "noise floored"]
+
+
+def test_offsets_interpolated_by_character_position():
+    index = TranscriptIndex()
+    index.add("s1", "chunk_0001", "aaaa bbbb", 0.0, 1.0)
+
+    assert index.search("aaaa")[0].offset_ms == 0
+    assert index.search("bbbb")[0].offset_ms == 1000 * 5 // 9
+
+
+def test_eviction_keeps_recent_tokens(tmp_path):
+    journal = tmp_path / "s1" / "transcripts" / "index.jsonl"
+    journal.parent.mkdir(parents=True)
+    index = TranscriptIndex(journal_path=str(journal), max_tokens_per_session=10)
+    for i in range(8):
+        index.add("s1", f"chunk_{i:04d}", f"word{i} filler", i, i + 1)
+
+    assert index.token_count() <= 10
+    assert index.search("word0") == []
+    assert index.search("word7")[0].chunk_id == "chunk_0007"
+
+    reloaded = TranscriptIndex.load(str(tmp_path))
+    assert reloaded.search("word0")[0].chunk_id == "chunk_0000"
+
+
+def test_postprocess_start_follows_trimmed_words():
+    session = types.SimpleNamespace()
+    first = {"segments": [{"start": 0.0, "end": 3.0, "text": "one two three four five six"}]}
+    postprocess_transcript(first, 0.0, "chunk_0001", session)
+
+    # The next chunk repeats the last five words before continuing
+    second = {"segments": [{"start": 0.0, "end": 3.0, "text": "two three four five six seven eight nine ten"}]}
+    update = postprocess_transcript(second, 2.5, "chunk_0002", session)
+
+    assert update["text"] == "seven eight nine ten"
+    text = second["segments"][0]["text"]
+    assert update["start"] == 2.5 + 3.0 * text.index("seven") / len(text)
+    assert update["end"] == 5.5
+
+
+def _journal(tmp_path, session_id: str) -> str:
+    path = tmp_path / session_id / "transcripts" / INDEX_FILENAME
+    path.parent.mkdir(parents=True)
+    return str(path)
+
+
+def test_load_saves_postings_and_reuses_them(tmp_path):
+    journal = _journal(tmp_path, "s1")
+    for i in range(3):
+        append_journal(journal, f"chunk_{i:04d}", f"alpha beta{i}", i, i + 1)
+
+    first = TranscriptIndex.load(str(tmp_path))
+    postings = tmp_path / "s1" / "transcripts" / POSTINGS_FILENAME
+    assert postings.exists()
+
+    second = TranscriptIndex.load(str(tmp_path))
+    assert second.token_count() == first.token_count() == 6
+    assert [(h.chunk_id, h.phrase) for h in second.search("alpha beta2")] == [("chunk_0002", "alpha beta2")]
+    assert second.search("beta1")[0].offset_ms == first.search("beta1")[0].offset_ms
+
+
+def test_load_reindexes_journal_that_grew(tmp_path):
+    journal = _journal(tmp_path, "s1")
+    append_journal(journal, "chunk_0001", "alpha", 0.0, 1.0)
+    TranscriptIndex.load(str(tmp_path))
+    append_journal(journal, "chunk_0002", "gamma", 1.0, 2.0)
+
+    assert TranscriptIndex.load(str(tmp_path)).search("gamma")[0].chunk_id == "chunk_0002"
+
+
+def test_loaded_index_accepts_new_spans(tmp_path):
+    append_journal(_journal(tmp_path, "s1"), "chunk_0001", "alpha beta", 0.0, 1.0)
+    TranscriptIndex.load(str(tmp_path))
+    index = TranscriptIndex.load(str(tmp_path))
+    index.add("s1", "chunk_0002", "gamma", 1.0, 2.0)
+
+    assert [h.chunk_id for h in index.search("gamma")] == ["chunk_0002"]
+    assert [h.phrase for h in index.search("beta gamma")] == ["beta gamma"]
+
+
+def test_write_paragraph_journals_without_live_index(tmp_path):
+    session = types.SimpleNamespace(session_id="s1", transcript_dir=str(tmp_path), event_bus=EventBus())
+    write_paragraph({"chunk_id": "chunk_0001", "text": "hello world", "start": 1.0, "end": 2.0}, session)
+
+    assert not hasattr(session, "transcript_index")
+    with open(tmp_path / INDEX_FILENAME, encoding="utf-8") as f:
+        assert json.loads(f.readline()) == {"chunk_id": "chunk_0001", "start_ms": 1000, "end_ms": 2000,
+                                            "text": "hello world"}
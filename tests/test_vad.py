@@ -0,0 +1,87 @@
+import logging
+
+import numpy as np
+import pytest
+
+from core import utils
+from core.vad import NumpyVadBackend, VadBackend, WebRtcVadBackend, create_vad_backend
+
+SAMPLE_RATE = 16000
+
+
+def _voiced(seconds: float = 1.0, f0: float = 140.0, dbfs: float = -25.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 20))
+    return _to_int16(signal, dbfs)
+
+
+def _noise(seconds: float = 1.0, dbfs: float = -35.0, seed: int = 0) -> np.ndarray:
+    return _to_int16(np.random.default_rng(seed).normal(0, 1, int(seconds * SAMPLE_RATE)), dbfs)
+
+
+def _to_int16(signal: np.ndarray, dbfs: float) -> np.ndarray:
+    signal = signal * (10 ** (dbfs / 20) / np.sqrt(np.mean(signal ** 2)))
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def test_backend_base_is_abstract():
+    with pytest.raises(TypeError):
+        VadBackend()
+
+
+def test_numpy_backend_separates_voice_from_noise_and_silence():
+    backend = NumpyVadBackend(mode=1)
+    assert backend.frame_decisions(_voiced(), SAMPLE_RATE).mean() > 0.9
+    assert backend.frame_decisions(_noise(), SAMPLE_RATE).mean() < 0.1
+    assert not backend.frame_decisions(np.zeros(SAMPLE_RATE, dtype=np.int16), SAMPLE_RATE).any()
+
+
+def test_numpy_backend_ignores_trailing_partial_frame():
+    decisions = NumpyVadBackend().frame_decisions(_voiced(0.1)[:1700], SAMPLE_RATE)
+    assert len(decisions) == 1700 // 480
+
+
+def test_webrtc_backend_classifies_frames():
+    pytest.importorskip("webrtcvad")
+    backend = WebRtcVadBackend(mode=1)
+    # Silence first: webrtcvad keeps flagging frames for a while after speech (hangover)
+    assert not backend.frame_decisions(np.zeros(SAMPLE_RATE, dtype=np.int16), SAMPLE_RATE).any()
+    assert backend.frame_decisions(_voiced(), SAMPLE_RATE).mean() > 0.5
+
+
+def test_batched_speech_ratios_match_per_chunk(monkeypatch):
+    backend = NumpyVadBackend()
+    monkeypatch.setattr(NumpyVadBackend, "BLOCK_SAMPLES", 2 * SAMPLE_RATE)  # Several passes per length
+    chunks = [_voiced(1.0), _noise(1.0), _voiced(0.5, dbfs=-40), _noise(1.0, seed=1), _voiced(1.0, f0=200),
+              np.zeros(SAMPLE_RATE, dtype=np.int16), _voiced(1.0)[:300]]
+    expected = [d.mean() if len(d) else 0.0 for d in (backend.frame_decisions(c, SAMPLE_RATE) for c in chunks)]
+    np.testing.assert_array_equal(backend.speech_ratios(chunks, SAMPLE_RATE), expected)
+
+
+def test_create_vad_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        create_vad_backend("silero", 1)
+
+
+def test_fallback_is_reported_once(monkeypatch, caplog):
+    monkeypatch.setattr(utils, "_vad_fallback_warning", "VAD backend 'webrtc' unavailable; using 'numpy' instead.")
+    logger = logging.getLogger("test_vad")
+    with caplog.at_level(logging.WARNING, logger="test_vad"):
+        utils.is_chunk_speech(np.zeros(SAMPLE_RATE, dtype=np.int16), SAMPLE_RATE, logger)
+        utils.is_chunk_speech(np.zeros(SAMPLE_RATE, dtype=np.int16), SAMPLE_RATE, logger)
+    assert [r.message for r in caplog.records].count("VAD backend 'webrtc' unavailable; using 'numpy' instead.") == 1
+
+
+def test_webrtc_errors_reach_the_session_logger(monkeypatch, caplog):
+    pytest.importorskip("webrtcvad")
+    backend = WebRtcVadBackend(mode=1)  # Created without a logger, like the module-level backend
+
+    def failing_is_speech(frame, sample_rate):
+        raise ValueError("bad frame")
+
+    monkeypatch.setattr(backend.vad, "is_speech", failing_is_speech)
+    monkeypatch.setattr(utils, "vad_backend", backend)
+    logger = logging.getLogger("test_vad")
+    with caplog.at_level(logging.ERROR, logger="test_vad"):
+        assert not utils.is_chunk_speech(_voiced(0.1), SAMPLE_RATE, logger)
+    assert "VAD processing error: bad frame" in [r.message for r in caplog.records]